@@ -0,0 +1,182 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_site import MockComicSite, MOCK_IMAGE_KB, MOCK_PAGE_SIZE
+from comic_crawler import Crawler, EPISODE_CONCURRENCY
+
+SAMPLE_INTERVAL = 0.2
+CHROME_PROCESS_NAMES = ('chrome', 'chromium', 'chromedriver', 'headless_shell')
+
+SUITE = [
+    ('baseline', {}),
+    ('latency', {'latency_ms': 50, 'image_latency_ms': 30}),
+    ('errors', {'error_rate': 0.05}),
+    ('browser', {'render': 'js', 'episodes': 6}),
+]
+
+def process_table():
+    table = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/status') as f:
+                fields = dict(line.split(':', 1) for line in f if ':' in line)
+        except OSError:
+            continue
+        rss_kb = fields.get('VmRSS', '0 kB').split()[0]
+        table[int(entry)] = (fields.get('Name', '').strip(), int(fields.get('PPid', '0').strip()), int(rss_kb))
+    return table
+
+def process_tree_usage(root_pid):
+    table = process_table()
+    children = {}
+    for pid, (_, parent, _) in table.items():
+        children.setdefault(parent, []).append(pid)
+    rss_kb = 0
+    chrome_processes = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        if pid not in table:
+            continue
+        name, _, rss = table[pid]
+        rss_kb += rss
+        if pid != root_pid and name.lower().startswith(CHROME_PROCESS_NAMES):
+            chrome_processes += 1
+        stack.extend(children.get(pid, []))
+    return rss_kb, chrome_processes
+
+class ResourceSampler:
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak_rss_kb = 0
+        self.peak_chrome_processes = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def sample(self):
+        rss_kb, chrome_processes = process_tree_usage(os.getpid())
+        self.peak_rss_kb = max(self.peak_rss_kb, rss_kb)
+        self.peak_chrome_processes = max(self.peak_chrome_processes, chrome_processes)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def __enter__(self):
+        self.sample()
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+        self.sample()
+
+def counter_total(summary, name, **labels):
+    return sum(
+        entry['value'] for entry in summary['counters'].get(name, [])
+        if all(entry['labels'].get(key) == value for key, value in labels.items())
+    )
+
+def run_scenario(name, options, crawler_settings, verbose=False):
+    site = MockComicSite(
+        series=options['series'], episodes=options['episodes'], images=options['images'], image_kb=options['image_kb'],
+        page_size=options['page_size'], latency=options['latency_ms'] / 1000, image_latency=options['image_latency_ms'] / 1000,
+        error_rate=options['error_rate'], render=options['render'], seed=options['seed']
+    )
+    output_dir = tempfile.mkdtemp(prefix='comic_bench_')
+    try:
+        with site, ResourceSampler() as sampler:
+            crawler = Crawler(
+                site.series_urls(), output_dir=output_dir, cache_dir=None,
+                on_log=(lambda message: print(message, flush=True)) if verbose else None,
+                **crawler_settings
+            )
+            start = time.perf_counter()
+            results = crawler.run()
+            elapsed = time.perf_counter() - start
+        summary = crawler.metrics.summary()
+        served = site.stats()
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    episodes = counter_total(summary, 'episodes_total', state='complete')
+    images = counter_total(summary, 'images_total', result='downloaded')
+    return {
+        'scenario': name,
+        'elapsed': round(elapsed, 3),
+        'episodes': episodes,
+        'images': images,
+        'episodes_per_min': round(episodes / elapsed * 60, 1) if elapsed else None,
+        'images_per_s': round(images / elapsed, 1) if elapsed else None,
+        'mib_per_s': round(counter_total(summary, 'image_bytes_total') / 1048576 / elapsed, 2) if elapsed else None,
+        'retries': counter_total(summary, 'retries_total'),
+        'failed_images': counter_total(summary, 'images_total', result='failed'),
+        'archives': sum(1 for zip_target in results.values() if zip_target),
+        'peak_rss_mib': round(sampler.peak_rss_kb / 1024, 1),
+        'peak_chrome_processes': sampler.peak_chrome_processes,
+        'requests_served': served['requests'],
+        'errors_injected': served['errors'],
+        'options': options
+    }
+
+def print_report(results):
+    print(f"{'scenario':<12}{'elapsed s':>10}{'episodes':>10}{'ep/min':>9}{'images/s':>10}{'MiB/s':>8}"
+          f"{'retries':>9}{'failed':>8}{'peak RSS MiB':>14}{'chrome':>8}")
+    for result in results:
+        print(f"{result['scenario']:<12}{result['elapsed']:>10.2f}{result['episodes']:>10}{result['episodes_per_min']:>9}"
+              f"{result['images_per_s']:>10}{result['mib_per_s']:>8}{result['retries']:>9}{result['failed_images']:>8}"
+              f"{result['peak_rss_mib']:>14}{result['peak_chrome_processes']:>8}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure crawler throughput against the local mock comic site.")
+    parser.add_argument('--suite', action='store_true', help="run the predefined scenarios instead of a single one")
+    parser.add_argument('--series', type=int, default=2)
+    parser.add_argument('--episodes', type=int, default=20)
+    parser.add_argument('--images', type=int, default=10)
+    parser.add_argument('--image-kb', type=float, default=MOCK_IMAGE_KB)
+    parser.add_argument('--page-size', type=int, default=MOCK_PAGE_SIZE)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--image-latency-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--render', choices=('html', 'js'), default='html')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--concurrency', type=int, default=EPISODE_CONCURRENCY)
+    parser.add_argument('--rate', type=float, default=0, help="per-host request rate for the crawler (0 disables the limit)")
+    parser.add_argument('--retry-backoff', type=float, default=0.05)
+    parser.add_argument('--json', metavar='PATH', help="also write the results as JSON")
+    parser.add_argument('--verbose', action='store_true', help="print crawler log lines")
+    args = parser.parse_args(argv)
+
+    base_options = {
+        'series': args.series, 'episodes': args.episodes, 'images': args.images, 'image_kb': args.image_kb,
+        'page_size': args.page_size, 'latency_ms': args.latency_ms, 'image_latency_ms': args.image_latency_ms,
+        'error_rate': args.error_rate, 'render': args.render, 'seed': args.seed
+    }
+    crawler_settings = {'concurrency': args.concurrency, 'host_rate': args.rate, 'retry_backoff': args.retry_backoff}
+    scenarios = SUITE if args.suite else [('custom', {})]
+    results = []
+    for name, overrides in scenarios:
+        options = dict(base_options, **overrides)
+        print(f"Running {name}: {options}", flush=True)
+        try:
+            results.append(run_scenario(name, options, crawler_settings, args.verbose))
+        except Exception as e:
+            print(f"  {name} failed: {str(e)}", flush=True)
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
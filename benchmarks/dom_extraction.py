@@ -0,0 +1,102 @@
+import os
+import sys
+import time
+import argparse
+from urllib.parse import urljoin
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium.webdriver.common.by import By
+from comic_crawler.browser import create_driver_factory, wait_for_document_ready, extract_series_page, extract_image_urls
+from comic_crawler.fetch import EPISODE_LINK_SELECTOR, EPISODE_TITLE_SELECTORS
+
+class RoundTripCounter:
+    def __init__(self, driver):
+        self.count = 0
+        original_execute = driver.execute
+
+        def execute(driver_command, params=None):
+            self.count += 1
+            return original_execute(driver_command, params)
+
+        driver.execute = execute
+
+def episodes_by_element(driver, url):
+    episodes = []
+    for ep_link in driver.find_elements(By.CSS_SELECTOR, EPISODE_LINK_SELECTOR):
+        href = ep_link.get_attribute('href')
+        if not href:
+            continue
+        title_element = None
+        for selector in EPISODE_TITLE_SELECTORS:
+            elements = ep_link.find_elements(By.CSS_SELECTOR, selector)
+            if elements:
+                title_element = elements[0]
+                break
+        if not title_element:
+            continue
+        episode_title = (title_element.text or "").strip() or (title_element.get_attribute('title') or "").strip()
+        if episode_title:
+            episodes.append((urljoin(url, href), episode_title))
+    return episodes
+
+def episodes_batched(driver, url):
+    state = extract_series_page(driver)
+    return [(urljoin(url, item['href']), item['title']) for item in state['episodes'] if item['href'] and item['title']]
+
+def images_by_element(driver, link):
+    img_urls = []
+    for wrap in driver.find_elements(By.CSS_SELECTOR, ".lazy-img-wrap"):
+        try:
+            img_tag = wrap.find_element(By.TAG_NAME, "img")
+        except Exception:
+            img_tag = None
+        img_url = None
+        if img_tag is not None:
+            img_url = (img_tag.get_attribute('data-src') or
+                       img_tag.get_attribute('data-original') or
+                       img_tag.get_attribute('src'))
+        if not img_url:
+            img_url = wrap.get_attribute('data-src') or wrap.get_attribute('data-original')
+        if img_url:
+            img_urls.append(urljoin(link, img_url))
+    return img_urls
+
+def images_batched(driver, link):
+    return [urljoin(link, img_url) for img_url in extract_image_urls(driver) if img_url]
+
+def measure(counter, label, extract, driver, url, repeat):
+    counter.count = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = extract(driver, url)
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"  {label:<11} {len(result):>5} items  {counter.count / repeat:>8.1f} round trips  {elapsed * 1000:>9.1f} ms")
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare per-element and batched DOM extraction.")
+    parser.add_argument('series_url', help="series main page URL")
+    parser.add_argument('episode_url', nargs='?', help="episode page URL")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    driver = create_driver_factory()()
+    try:
+        counter = RoundTripCounter(driver)
+        cases = [(args.series_url, "Episode list", episodes_by_element, episodes_batched)]
+        if args.episode_url:
+            cases.append((args.episode_url, "Image URLs", images_by_element, images_batched))
+        for url, title, by_element, batched in cases:
+            driver.get(url)
+            wait_for_document_ready(driver)
+            print(f"{title}: {url}")
+            legacy = measure(counter, "by element", by_element, driver, url, args.repeat)
+            batch = measure(counter, "batched", batched, driver, url, args.repeat)
+            if legacy != batch:
+                print("  WARNING: results differ between the two paths")
+    finally:
+        driver.quit()
+
+if __name__ == "__main__":
+    main()
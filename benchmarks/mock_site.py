@@ -0,0 +1,223 @@
+import re
+import time
+import random
+import hashlib
+import argparse
+import threading
+from html import escape
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+MOCK_IMAGE_KB = 200
+MOCK_PAGE_SIZE = 10
+JPEG_HEADER = b'\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00'
+JPEG_TRAILER = b'\xff\xd9'
+ACTIVE_CLASS = ' class="active"'
+
+LAZY_IMAGES_SCRIPT = """
+<script>
+document.addEventListener('DOMContentLoaded', () => {
+    const urls = %s;
+    let index = 0;
+    const add = () => {
+        const wrap = document.createElement('div');
+        wrap.className = 'lazy-img-wrap';
+        const img = document.createElement('img');
+        img.setAttribute('data-src', urls[index++]);
+        wrap.appendChild(img);
+        document.getElementById('viewer').appendChild(wrap);
+        if (index < urls.length) setTimeout(add, 10);
+    };
+    if (urls.length) add();
+});
+</script>
+"""
+
+class MockComicSite:
+    def __init__(self, series=1, episodes=20, images=10, image_kb=MOCK_IMAGE_KB, page_size=MOCK_PAGE_SIZE,
+                 latency=0.0, image_latency=0.0, error_rate=0.0, render='html', seed=0, host='127.0.0.1', port=0):
+        self.series = series
+        self.episodes = episodes
+        self.images = images
+        self.image_size = max(len(JPEG_HEADER) + len(JPEG_TRAILER), int(image_kb * 1024))
+        self.page_size = max(1, page_size)
+        self.latency = latency
+        self.image_latency = image_latency
+        self.error_rate = error_rate
+        self.render = render
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self.stats_lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self.handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def series_urls(self):
+        return [f"{self.base_url}/series/{series}" for series in range(1, self.series + 1)]
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def inject_error(self):
+        if not self.error_rate:
+            return False
+        with self.random_lock:
+            return self.random.random() < self.error_rate
+
+    def count(self, sent, error=False):
+        with self.stats_lock:
+            self.requests += 1
+            self.bytes_sent += sent
+            if error:
+                self.errors += 1
+
+    def stats(self):
+        with self.stats_lock:
+            return {'requests': self.requests, 'errors': self.errors, 'bytes_sent': self.bytes_sent}
+
+    def series_page(self, series, page):
+        pages = max(1, -(-self.episodes // self.page_size))
+        page = min(max(1, page), pages)
+        first = (page - 1) * self.page_size + 1
+        items = ''.join(
+            f'<li><a href="/series/{series}/detail/{episode}">'
+            f'<h1 class="m-episode-list-item-title">{episode}화</h1></a></li>'
+            for episode in range(first, min(self.episodes, first + self.page_size - 1) + 1)
+        )
+        buttons = ''
+        if pages > 1:
+            buttons = '<div class="mPagination">' + ''.join(
+                f'<button data-page="{value}"{ACTIVE_CLASS if value == page else ""}>{value}</button>'
+                for value in range(1, pages + 1)
+            ) + '</div>'
+        return (
+            '<html><head><meta charset="utf-8"><title>Mock series</title></head><body>'
+            f'<div class="dt-left-tt"><h1>{escape(f"Mock Series {series}")}</h1></div>'
+            '<div class="detail-title1"><a class="m-episode-link">Mock Author</a></div>'
+            f'<ul>{items}</ul>{buttons}</body></html>'
+        )
+
+    def episode_page(self, series, episode):
+        urls = [f"/img/{series}/{episode}/{index}.jpg" for index in range(self.images)]
+        if self.render == 'js':
+            body = '<div id="viewer"></div>' + LAZY_IMAGES_SCRIPT % repr(urls)
+        else:
+            body = '<div id="viewer">' + ''.join(
+                f'<div class="lazy-img-wrap"><img data-src="{url}"></div>' for url in urls
+            ) + '</div>'
+        return f'<html><head><meta charset="utf-8"></head><body>{body}</body></html>'
+
+    def image_bytes(self, series, episode, index):
+        seed = hashlib.sha256(f"{series}/{episode}/{index}".encode()).digest()
+        filler_size = self.image_size - len(JPEG_HEADER) - len(JPEG_TRAILER)
+        filler = (seed * (filler_size // len(seed) + 1))[:filler_size]
+        return JPEG_HEADER + filler + JPEG_TRAILER
+
+    def handler_class(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def send_body(self, status, body, content_type, headers=None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self.wfile.write(body)
+                site.count(len(body), error=status >= 500)
+
+            def do_HEAD(self):
+                self.do_GET()
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                is_image = parsed.path.startswith('/img/')
+                delay = site.image_latency if is_image else site.latency
+                if delay:
+                    time.sleep(delay)
+                if site.inject_error():
+                    self.send_body(503, b'', 'text/plain', {'Retry-After': '0'})
+                    return
+                match = re.fullmatch(r'/series/(\d+)', parsed.path)
+                if match and 1 <= int(match.group(1)) <= site.series:
+                    page = parse_qs(parsed.query).get('page', ['1'])[0]
+                    html = site.series_page(int(match.group(1)), int(page) if page.isdigit() else 1)
+                    self.send_body(200, html.encode('utf-8'), 'text/html; charset=utf-8')
+                    return
+                match = re.fullmatch(r'/series/(\d+)/detail/(\d+)', parsed.path)
+                if match and 1 <= int(match.group(1)) <= site.series and 1 <= int(match.group(2)) <= site.episodes:
+                    html = site.episode_page(int(match.group(1)), int(match.group(2)))
+                    self.send_body(200, html.encode('utf-8'), 'text/html; charset=utf-8')
+                    return
+                match = re.fullmatch(r'/img/(\d+)/(\d+)/(\d+)\.jpg', parsed.path)
+                if match and int(match.group(3)) < site.images:
+                    etag = '"' + hashlib.sha1(parsed.path.encode()).hexdigest() + '"'
+                    if self.headers.get('If-None-Match') == etag:
+                        self.send_body(304, b'', 'image/jpeg', {'ETag': etag})
+                        return
+                    body = site.image_bytes(*(int(group) for group in match.groups()))
+                    self.send_body(200, body, 'image/jpeg', {'ETag': etag, 'Cache-Control': 'max-age=3600'})
+                    return
+                self.send_body(404, b'Not found', 'text/plain')
+
+        return Handler
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a synthetic comic site with the markup the crawler expects.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--series', type=int, default=1)
+    parser.add_argument('--episodes', type=int, default=20)
+    parser.add_argument('--images', type=int, default=10, help="images per episode")
+    parser.add_argument('--image-kb', type=float, default=MOCK_IMAGE_KB)
+    parser.add_argument('--page-size', type=int, default=MOCK_PAGE_SIZE, help="episodes per list page")
+    parser.add_argument('--latency-ms', type=float, default=0, help="delay before every page response")
+    parser.add_argument('--image-latency-ms', type=float, default=0, help="delay before every image response")
+    parser.add_argument('--error-rate', type=float, default=0, help="fraction of requests answered with 503")
+    parser.add_argument('--render', choices=('html', 'js'), default='html', help="serve image wraps in HTML or insert them with JavaScript")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    site = MockComicSite(
+        series=args.series, episodes=args.episodes, images=args.images, image_kb=args.image_kb, page_size=args.page_size,
+        latency=args.latency_ms / 1000, image_latency=args.image_latency_ms / 1000, error_rate=args.error_rate,
+        render=args.render, seed=args.seed, host=args.host, port=args.port
+    )
+    for url in site.series_urls():
+        print(url, flush=True)
+    try:
+        site.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        site.server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+from .core import Crawler, EPISODE_CONCURRENCY, sanitize_path_component, episode_sort_key
+
+__all__ = ['Crawler', 'EPISODE_CONCURRENCY', 'sanitize_path_component', 'episode_sort_key']
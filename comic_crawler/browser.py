@@ -0,0 +1,259 @@
+import os
+import time
+import threading
+import platform
+import subprocess
+from urllib.parse import urljoin
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from webdriver_manager.chrome import ChromeDriverManager
+from .fetch import USER_AGENT, EPISODE_LINK_SELECTOR, EPISODE_TITLE_SELECTORS, PAGINATION_SELECTORS, ACTIVE_PAGE_SELECTOR
+
+READY_TIMEOUT = 15
+IMAGE_SETTLE_MS = 750
+IMAGE_SETTLE_TIMEOUT_MS = 20000
+BLOCKED_RESOURCE_PATTERNS = [
+    '*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*', '*.avif*', '*.bmp*', '*.ico*',
+    '*.woff*', '*.ttf*', '*.otf*', '*.eot*',
+    '*.mp4*', '*.webm*', '*.m3u8*', '*.mp3*', '*.ogg*'
+]
+BLOCKED_AD_HOSTS = [
+    'doubleclick.net', 'googlesyndication.com', 'googleadservices.com', 'google-analytics.com',
+    'googletagmanager.com', 'googletagservices.com', 'adservice.google.com', 'facebook.net',
+    'scorecardresearch.com', 'criteo.com', 'criteo.net', 'taboola.com', 'outbrain.com',
+    'adnxs.com', 'amazon-adsystem.com', 'mobon.net', 'dable.io'
+]
+
+WAIT_FOR_IMAGE_WRAPS_SCRIPT = """
+const selector = arguments[0], quietMs = arguments[1], timeoutMs = arguments[2], scroll = arguments[3];
+const done = arguments[arguments.length - 1];
+const count = () => document.querySelectorAll(selector).length;
+let lastCount = count();
+let quietTimer = null;
+let finished = false;
+const finish = () => {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(quietTimer);
+    clearTimeout(deadline);
+    done(count());
+};
+const settle = () => {
+    clearTimeout(quietTimer);
+    if (scroll) window.scrollTo(0, document.body.scrollHeight);
+    if (lastCount > 0) quietTimer = setTimeout(finish, quietMs);
+};
+const observer = new MutationObserver(() => {
+    const current = count();
+    if (scroll || current !== lastCount) {
+        lastCount = current;
+        settle();
+    }
+});
+observer.observe(document.documentElement, {childList: true, subtree: true, attributes: scroll});
+const deadline = setTimeout(finish, timeoutMs);
+settle();
+"""
+
+EXTRACT_SERIES_PAGE_SCRIPT = """
+const linkSelector = arguments[0], titleSelectors = arguments[1], paginationSelectors = arguments[2], activeSelector = arguments[3];
+const text = (element) => element ? (element.innerText || '').trim() : '';
+const episodes = Array.from(document.querySelectorAll(linkSelector)).map((link) => {
+    let titleElement = null;
+    for (const selector of titleSelectors) {
+        titleElement = link.querySelector(selector);
+        if (titleElement) break;
+    }
+    return {
+        href: link.href || link.getAttribute('href'),
+        hasTitleElement: !!titleElement,
+        title: titleElement ? (text(titleElement) || (titleElement.getAttribute('title') || '').trim()) : ''
+    };
+});
+const pages = [];
+for (const selector of paginationSelectors) {
+    for (const button of document.querySelectorAll(selector)) {
+        const page = button.getAttribute('data-page');
+        if (page && !pages.includes(page)) pages.push(page);
+    }
+}
+const activeButton = document.querySelector(activeSelector);
+return {
+    title: text(document.querySelector('div.dt-left-tt h1')),
+    author: text(document.querySelector('div.detail-title1 a.m-episode-link')),
+    episodes: episodes,
+    pages: pages,
+    activePage: activeButton ? activeButton.getAttribute('data-page') : null
+};
+"""
+
+TRANSFERRED_BYTES_SCRIPT = """
+return performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'))
+    .reduce((total, entry) => total + (entry.transferSize || 0), 0);
+"""
+
+EXTRACT_IMAGE_URLS_SCRIPT = """
+return Array.from(document.querySelectorAll(arguments[0])).map((wrap) => {
+    const img = wrap.querySelector('img');
+    let url = img ? (img.getAttribute('data-src') || img.getAttribute('data-original') || img.getAttribute('src')) : null;
+    if (!url) url = wrap.getAttribute('data-src') || wrap.getAttribute('data-original');
+    return url;
+});
+"""
+
+def wait_for_document_ready(driver, timeout=READY_TIMEOUT):
+    WebDriverWait(driver, timeout).until(
+        lambda d: d.execute_script("return document.readyState") in ('interactive', 'complete')
+    )
+
+def wait_for_image_wraps(driver, scroll=False, quiet_ms=IMAGE_SETTLE_MS, timeout_ms=IMAGE_SETTLE_TIMEOUT_MS):
+    driver.set_script_timeout(timeout_ms / 1000 + 5)
+    return driver.execute_async_script(WAIT_FOR_IMAGE_WRAPS_SCRIPT, ".lazy-img-wrap", quiet_ms, timeout_ms, scroll)
+
+def blocked_url_patterns():
+    return BLOCKED_RESOURCE_PATTERNS + [f"*{host}*" for host in BLOCKED_AD_HOSTS]
+
+def create_driver_factory(block_resources=True):
+    os.environ['WDM_LOG_LEVEL'] = '0'
+    os.environ['WDM_PRINT_FIRST_LINE'] = 'False'
+
+    chrome_options = Options()
+    chrome_options.add_argument('--headless')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--enable-gpu')
+    chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.add_argument('--log-level=3')
+    chrome_options.add_argument('--disable-logging')
+    chrome_options.add_argument('--disable-in-process-stack-traces')
+    chrome_options.add_argument(f'user-agent={USER_AGENT}')
+    chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
+    if block_resources:
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        chrome_options.add_argument('--autoplay-policy=user-gesture-required')
+        chrome_options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.default_content_setting_values.notifications': 2
+        })
+
+    driver_path = None
+    driver_path_lock = threading.Lock()
+
+    def create_driver():
+        nonlocal driver_path
+        with driver_path_lock:
+            if driver_path is None:
+                driver_path = ChromeDriverManager().install()
+        service = Service(driver_path)
+        if platform.system() == 'Windows':
+            service.creation_flags = subprocess.CREATE_NO_WINDOW
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+        if block_resources:
+            try:
+                driver.execute_cdp_cmd('Network.enable', {})
+                driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked_url_patterns()})
+            except Exception:
+                driver.quit()
+                raise
+        return driver
+
+    return create_driver
+
+def extract_series_page(driver):
+    return driver.execute_script(
+        EXTRACT_SERIES_PAGE_SCRIPT, EPISODE_LINK_SELECTOR, EPISODE_TITLE_SELECTORS, PAGINATION_SELECTORS, ACTIVE_PAGE_SELECTOR
+    )
+
+def transferred_bytes(driver):
+    try:
+        return driver.execute_script(TRANSFERRED_BYTES_SCRIPT) or 0
+    except Exception:
+        return 0
+
+def extract_image_urls(driver):
+    return driver.execute_script(EXTRACT_IMAGE_URLS_SCRIPT, ".lazy-img-wrap")
+
+def crawl_series_with_browser(driver, url, log, is_running=lambda: True):
+    log(f"Loading main page: {url}")
+    stage_start = time.monotonic()
+    driver.get(url)
+    wait_for_document_ready(driver)
+    try:
+        WebDriverWait(driver, READY_TIMEOUT).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, EPISODE_LINK_SELECTOR))
+        )
+    except Exception:
+        log("Episode links did not appear before the timeout.")
+    log(f"Main page ready in {time.monotonic() - stage_start:.1f}s.")
+
+    state = extract_series_page(driver)
+    episodes = []
+
+    def collect_current_page_episodes(state):
+        for item in state['episodes']:
+            if not item['href']:
+                continue
+            if not item['hasTitleElement']:
+                log("Could not find episode title element.")
+                continue
+            if not item['title']:
+                log("Could not find episode title.")
+                continue
+            episodes.append((urljoin(url, item['href']), item['title']))
+
+    def page_values(state):
+        return {page_value for page_value in state['pages'] if page_value and page_value.isdigit()}
+
+    frontier = page_values(state)
+    visited_pages = set()
+
+    if not frontier:
+        collect_current_page_episodes(state)
+    else:
+        while frontier and is_running():
+            page_value = min(frontier, key=int)
+            frontier.discard(page_value)
+            if state['activePage'] != page_value:
+                button_xpath = f"//button[@data-page='{page_value}']"
+                reference_elements = driver.find_elements(By.CSS_SELECTOR, EPISODE_LINK_SELECTOR)
+                reference_element = reference_elements[0] if reference_elements else None
+                try:
+                    target_button = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.XPATH, button_xpath)))
+                    driver.execute_script("arguments[0].click();", target_button)
+                    if reference_element:
+                        WebDriverWait(driver, 10).until(EC.staleness_of(reference_element))
+                    WebDriverWait(driver, 10).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, EPISODE_LINK_SELECTOR))
+                    )
+                except Exception as e:
+                    log(f"Failed to navigate to page {page_value}: {str(e)}")
+                    visited_pages.add(page_value)
+                    continue
+                state = extract_series_page(driver)
+            collect_current_page_episodes(state)
+            visited_pages.add(page_value)
+            frontier.update(page_values(state) - visited_pages)
+
+    return {'title': state['title'], 'author': state['author'], 'episodes': episodes}
+
+def collect_image_urls(driver, link, log, is_running=lambda: True, scroll=False):
+    stage_start = time.monotonic()
+    driver.get(link)
+    wait_for_document_ready(driver)
+    page_ready = time.monotonic()
+    try:
+        wait_for_image_wraps(driver, scroll=scroll)
+    except Exception as e:
+        log(f"  Image wraps did not settle: {str(e)}")
+    images_ready = time.monotonic()
+    raw_urls = extract_image_urls(driver)
+    log(
+        f"  Found {len(raw_urls)} image wraps (page ready {page_ready - stage_start:.1f}s, images settled {images_ready - page_ready:.1f}s, "
+        f"Chrome transferred {transferred_bytes(driver) / 1024:.0f} KiB)."
+    )
+    return [urljoin(link, img_url) for img_url in raw_urls if img_url]
@@ -0,0 +1,134 @@
+import os
+import time
+import shutil
+import sqlite3
+import threading
+from .fetch import PARTIAL_SUFFIX
+
+IMAGE_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'comic_crawler', 'images')
+IMAGE_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+def link_or_copy(source, target):
+    temp_path = f"{target}.{os.getpid()}.{threading.get_ident()}{PARTIAL_SUFFIX}"
+    try:
+        os.link(source, temp_path)
+    except OSError:
+        shutil.copyfile(source, temp_path)
+    os.replace(temp_path, target)
+
+class ImageCache:
+    def __init__(self, root=IMAGE_CACHE_DIR, max_bytes=IMAGE_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.deduplicated = 0
+        self.evicted = 0
+        os.makedirs(os.path.join(root, 'blobs'), exist_ok=True)
+        self.connection = sqlite3.connect(os.path.join(root, 'index.sqlite'), timeout=30, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS urls ("
+                "url TEXT PRIMARY KEY, sha256 TEXT, etag TEXT, last_modified TEXT, ext TEXT)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS blobs ("
+                "sha256 TEXT PRIMARY KEY, size INTEGER, last_access REAL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS blobs_last_access ON blobs (last_access)")
+            self.total_bytes = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def blob_path(self, sha256):
+        return os.path.join(self.root, 'blobs', sha256[:2], sha256)
+
+    def lookup(self, url):
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT urls.*, blobs.size FROM urls JOIN blobs ON blobs.sha256 = urls.sha256 WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None or not os.path.exists(self.blob_path(row['sha256'])):
+            return None
+        return dict(row)
+
+    def validators(self, record):
+        headers = {}
+        if record.get('etag'):
+            headers['If-None-Match'] = record['etag']
+        if record.get('last_modified'):
+            headers['If-Modified-Since'] = record['last_modified']
+        return headers
+
+    def materialize(self, record, directory, stem, revalidated=False):
+        filename = f"{stem}{record['ext']}"
+        try:
+            link_or_copy(self.blob_path(record['sha256']), os.path.join(directory, filename))
+        except FileNotFoundError:
+            return None
+        with self.lock, self.connection:
+            self.connection.execute("UPDATE blobs SET last_access = ? WHERE sha256 = ?", (time.time(), record['sha256']))
+            if revalidated:
+                self.revalidated += 1
+            else:
+                self.hits += 1
+        return filename, record['size'], record['sha256']
+
+    def store(self, path, url, sha256, size, etag=None, last_modified=None):
+        blob = self.blob_path(sha256)
+        with self.lock, self.connection:
+            self.misses += 1
+            now = time.time()
+            inserted = self.connection.execute(
+                "INSERT OR IGNORE INTO blobs (sha256, size, last_access) VALUES (?, ?, ?)", (sha256, size, now)
+            ).rowcount == 1
+            if inserted:
+                self.total_bytes += size
+            else:
+                self.connection.execute("UPDATE blobs SET last_access = ? WHERE sha256 = ?", (now, sha256))
+                self.deduplicated += 1
+            self.connection.execute(
+                "INSERT OR REPLACE INTO urls (url, sha256, etag, last_modified, ext) VALUES (?, ?, ?, ?, ?)",
+                (url, sha256, etag, last_modified, os.path.splitext(path)[1])
+            )
+        if not inserted and os.path.exists(blob):
+            link_or_copy(blob, path)
+        else:
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            link_or_copy(path, blob)
+        self.evict()
+
+    def evict(self):
+        while True:
+            with self.lock, self.connection:
+                if self.total_bytes <= self.max_bytes:
+                    return
+                row = self.connection.execute("SELECT sha256, size FROM blobs ORDER BY last_access LIMIT 1").fetchone()
+                if row is None:
+                    self.total_bytes = 0
+                    return
+                self.connection.execute("DELETE FROM blobs WHERE sha256 = ?", (row['sha256'],))
+                self.connection.execute("DELETE FROM urls WHERE sha256 = ?", (row['sha256'],))
+                self.total_bytes -= row['size']
+                self.evicted += 1
+            try:
+                os.remove(self.blob_path(row['sha256']))
+            except OSError:
+                pass
+
+    def stats(self):
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'revalidated': self.revalidated,
+                'misses': self.misses,
+                'deduplicated': self.deduplicated,
+                'evicted': self.evicted,
+                'bytes': self.total_bytes
+            }
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
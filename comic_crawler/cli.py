@@ -0,0 +1,141 @@
+import sys
+import json
+import time
+import argparse
+import threading
+from .core import Crawler, EPISODE_CONCURRENCY
+from .fetch import IMAGE_CONCURRENCY, IMAGE_PER_HOST_LIMIT, HOST_RATE_LIMIT, RETRY_ATTEMPTS, RETRY_BACKOFF
+from .pool import DRIVER_POOL_SIZE, DRIVER_RECYCLE_AFTER
+from .cache import IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES
+from .postprocess import POST_PROCESS_FORMATS, POST_PROCESS_QUALITY
+from .jobs import JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, JobQueue
+
+COMMANDS = {
+    'crawl': "Download comic series without the GUI.",
+    'publish': "Crawl episode lists and publish episodes to a shared job queue.",
+    'worker': "Process episodes from a shared job queue and package finished series."
+}
+
+def build_parser(command='crawl'):
+    prog = 'comic_crawler' if command == 'crawl' else f'comic_crawler {command}'
+    parser = argparse.ArgumentParser(prog=prog, description=COMMANDS[command])
+    if command != 'worker':
+        parser.add_argument('urls', nargs='+', metavar='URL', help="series main page URL")
+    if command != 'crawl':
+        parser.add_argument('--queue', required=True, metavar='PATH', help="SQLite job queue shared by the publisher and workers")
+        parser.add_argument('--lease-seconds', type=int, default=JOB_LEASE_SECONDS, help="seconds before an unrenewed episode lease is re-delivered")
+        parser.add_argument('--max-attempts', type=int, default=JOB_MAX_ATTEMPTS, help="deliveries per episode before it is marked failed")
+    if command == 'worker':
+        parser.add_argument('--worker-id', help="name recorded on leased jobs (default: host:pid)")
+        parser.add_argument('--keep-running', action='store_true', help="keep polling when the queue is empty")
+    parser.add_argument('-o', '--output-dir', default='.', help="directory for downloads, archives and manifests (shared between workers)")
+    parser.add_argument('--concurrency', type=int, default=EPISODE_CONCURRENCY, help="episodes processed in parallel across all series")
+    parser.add_argument('--image-concurrency', type=int, default=IMAGE_CONCURRENCY, help="image downloads in parallel")
+    parser.add_argument('--per-host-limit', type=int, default=IMAGE_PER_HOST_LIMIT, help="parallel requests per host")
+    parser.add_argument('--rate', type=float, default=HOST_RATE_LIMIT, help="requests per second per host (0 disables the limit)")
+    parser.add_argument('--retries', type=int, default=RETRY_ATTEMPTS, help="attempts per page or image before giving up")
+    parser.add_argument('--retry-backoff', type=float, default=RETRY_BACKOFF, help="base delay in seconds for exponential backoff")
+    parser.add_argument('--pool-size', type=int, default=DRIVER_POOL_SIZE, help="maximum Chrome instances")
+    parser.add_argument('--recycle-after', type=int, default=DRIVER_RECYCLE_AFTER, help="episodes per Chrome instance before restarting it")
+    parser.add_argument('--cbz', action='store_true', help="also write one CBZ file per updated episode")
+    parser.add_argument('--scroll', action='store_true', help="scroll episode pages in Chrome before reading image URLs")
+    parser.add_argument('--transcode', choices=POST_PROCESS_FORMATS, help="re-encode downloaded images before archiving (needs Pillow)")
+    parser.add_argument('--quality', type=int, default=POST_PROCESS_QUALITY, help="encoder quality for transcoded images and pages")
+    parser.add_argument('--page-height', type=int, default=0, help="stitch and split each episode into pages of this height")
+    parser.add_argument('--thumbnail-size', type=int, default=0, help="write a thumbnail of this width per episode")
+    parser.add_argument('--post-process-workers', type=int, help="processes for image post-processing (default: CPU count)")
+    parser.add_argument('--no-block-resources', action='store_true', help="let Chrome load images, fonts, media and ad hosts")
+    parser.add_argument('--cache-dir', default=IMAGE_CACHE_DIR, help="content-addressed image cache directory")
+    parser.add_argument('--cache-size-mb', type=int, default=IMAGE_CACHE_MAX_BYTES // (1024 * 1024), help="image cache size cap in MiB")
+    parser.add_argument('--no-cache', action='store_true', help="disable the image cache")
+    parser.add_argument('--json-log', action='store_true', help="write one JSON object per event to stdout")
+    parser.add_argument('--metrics-json', metavar='PATH', help="write a JSON metrics summary when the run ends")
+    parser.add_argument('--metrics-prometheus', metavar='PATH', help="write metrics in Prometheus text format when the run ends")
+    return parser
+
+def make_emitter(json_log):
+    lock = threading.Lock()
+
+    def emit(event, **data):
+        with lock:
+            write(event, data)
+
+    def write(event, data):
+        if json_log:
+            record = {'time': round(time.time(), 3), 'event': event}
+            record.update(data)
+            print(json.dumps(record, ensure_ascii=False), flush=True)
+        elif event == 'log':
+            print(data['message'], flush=True)
+        elif event == 'series_progress':
+            print(f"Progress [{data['title']}]: {data['completed']}/{data['total']}", flush=True)
+        elif event == 'progress':
+            print(f"Progress: {data['completed']}/{data['total']}", flush=True)
+    return emit
+
+def write_metrics(metrics, args, emit):
+    if args.json_log:
+        emit('metrics', summary=metrics.summary())
+    for path, render in ((args.metrics_json, metrics.to_json), (args.metrics_prometheus, metrics.prometheus)):
+        if not path:
+            continue
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(render())
+        except OSError as e:
+            emit('log', message=f"Failed to write metrics to {path}: {str(e)}")
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    command = argv.pop(0) if argv and argv[0] in COMMANDS else 'crawl'
+    args = build_parser(command).parse_args(argv)
+    emit = make_emitter(args.json_log)
+    crawler = Crawler(
+        getattr(args, 'urls', []),
+        output_dir=args.output_dir,
+        concurrency=args.concurrency,
+        pool_size=args.pool_size,
+        recycle_after=args.recycle_after,
+        image_concurrency=args.image_concurrency,
+        per_host_limit=args.per_host_limit,
+        host_rate=args.rate,
+        retries=args.retries,
+        retry_backoff=args.retry_backoff,
+        transcode=args.transcode,
+        quality=args.quality,
+        page_height=args.page_height,
+        thumbnail_size=args.thumbnail_size,
+        post_process_workers=args.post_process_workers,
+        write_cbz=args.cbz,
+        scroll_for_images=args.scroll,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        cache_max_bytes=args.cache_size_mb * 1024 * 1024,
+        block_resources=not args.no_block_resources,
+        on_log=lambda message: emit('log', message=message.strip('\n')),
+        on_progress=lambda completed, total: emit('progress', completed=completed, total=total),
+        on_title=lambda title: emit('title', title=title),
+        on_series_progress=lambda url, title, completed, total: emit('series_progress', series=url, title=title, completed=completed, total=total),
+        on_image_progress=(lambda completed, total: emit('image_progress', completed=completed, total=total)) if args.json_log else None
+    )
+    queue = JobQueue(args.queue, args.lease_seconds, args.max_attempts) if command != 'crawl' else None
+    try:
+        if command == 'publish':
+            published = crawler.publish(queue)
+            for url, count in published.items():
+                emit('published', series=url, episodes=count)
+            return 1 if any(count is None for count in published.values()) else 0
+        if command == 'worker':
+            results = crawler.work(queue, args.worker_id, exit_when_idle=not args.keep_running)
+        else:
+            results = crawler.run()
+    except KeyboardInterrupt:
+        crawler.stop()
+        emit('log', message="Interrupted.")
+        return 130
+    finally:
+        write_metrics(crawler.metrics, args, emit)
+        if queue is not None:
+            queue.close()
+    for url, zip_target in results.items():
+        emit('finished', series=url, archive=zip_target)
+    return 1 if any(zip_target is None for zip_target in results.values()) else 0
@@ -0,0 +1,896 @@
+import os
+import re
+import sys
+import time
+import shutil
+import threading
+import multiprocessing
+from collections import deque
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from .fetch import (
+    IMAGE_CONCURRENCY, IMAGE_PER_HOST_LIMIT, HOST_RATE_LIMIT, IMAGE_EXTENSIONS, RETRY_ATTEMPTS, RETRY_BACKOFF,
+    create_session, HostLimiter, RetryPolicy, save_streamed_image, remove_partial_downloads,
+    fetch_html, parse_image_urls, crawl_series_http, is_retryable
+)
+from .storage import (
+    MANIFEST_SUFFIX, MANIFEST_JOURNAL_MODE, SHARED_JOURNAL_MODE, CrawlManifest, SeriesArchive, image_file_matches, recover_archive
+)
+from .pool import DRIVER_POOL_SIZE, DRIVER_RECYCLE_AFTER, DriverPool
+from .cache import IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES, ImageCache
+from .metrics import Metrics
+from .jobs import WORKER_POLL_INTERVAL, LeaseKeeper, default_worker_id
+from .postprocess import (
+    POST_PROCESS_QUALITY, PROCESSED_DIR, post_process_options, options_signature, pillow_available, process_episode_images
+)
+
+EPISODE_CONCURRENCY = 3
+
+def sanitize_path_component(value):
+    if not value:
+        return "Unknown"
+    sanitized = re.sub(r'[<>:\"/\\|?*]', '_', value)
+    sanitized = sanitized.strip().strip('.')
+    return sanitized or "Unknown"
+
+def episode_sort_key(value):
+    if not value:
+        return (sys.maxsize,)
+    parts = [int(part) for part in re.findall(r'\d+', value)]
+    return tuple(parts) if parts else (sys.maxsize,)
+
+class SeriesCrawl:
+    def __init__(self, crawler, url):
+        self.crawler = crawler
+        self.url = url
+        self.label = url
+        self.comic_title = "Unknown"
+        self.author_name = "Unknown"
+        self.episode_info_list = []
+        self.seen_episode_titles = set()
+        self.pending = deque()
+        self.total = 0
+        self.completed = 0
+        self.manifest = None
+        self.archive = None
+        self.zip_target = None
+        self.failed = []
+        self.requeued = False
+        self.processing = []
+        self.processing_lock = threading.Lock()
+        self.retry_policy = RetryPolicy(crawler.retries, crawler.retry_backoff, on_retry=self.retry_logger(), is_running=lambda: self.running)
+
+    @property
+    def running(self):
+        return self.crawler.running
+
+    def log(self, message):
+        self.crawler.log(message, self)
+
+    def retry_logger(self, episode_num=None):
+        def log_retry(stage, target, attempt, delay, error):
+            self.log(f"  Retrying {stage} in {delay:.1f}s (attempt {attempt + 1}/{self.retry_policy.attempts}): {target} - {str(error)}")
+            self.crawler.metrics.inc('retries_total', series=self.url, stage=stage)
+            if episode_num is not None:
+                self.crawler.metrics.episode_add(self.url, episode_num, retries=1)
+        return log_retry
+
+    def requeue_failed(self):
+        if self.requeued or not self.failed or not self.running:
+            return 0
+        self.requeued = True
+        failed, self.failed = self.failed, []
+        self.log(f"\nRe-queueing {len(failed)} failed or incomplete episodes.")
+        self.pending.extend(failed)
+        self.total += len(failed)
+        return len(failed)
+
+    def queue_meta(self):
+        return {
+            'title': self.comic_title,
+            'author': self.author_name,
+            'episodes': [
+                {key: info[key] for key in ('link', 'comic_title', 'episode_num', 'title_text')}
+                for info in self.episode_info_list
+            ]
+        }
+
+    def restore(self, meta, recover=False):
+        self.comic_title = meta['title']
+        self.author_name = meta['author']
+        self.label = self.comic_title
+        self.episode_info_list = [dict(info) for info in meta['episodes']]
+        self.seen_episode_titles = {info['episode_num'] for info in self.episode_info_list}
+        if not self.prepare(recover):
+            return False
+        self.pending.clear()
+        return True
+
+    def add_episode(self, href, episode_title):
+        self.log(f"Found: {episode_title}")
+        if episode_title and episode_title not in self.seen_episode_titles:
+            self.seen_episode_titles.add(episode_title)
+            self.episode_info_list.append({
+                'link': href,
+                'comic_title': self.comic_title,
+                'episode_num': episode_title,
+                'title_text': episode_title
+            })
+
+    def record_series(self, series):
+        self.comic_title = series['title'] or "Unknown"
+        self.author_name = series['author'] or "Unknown"
+        self.crawler.metrics.series_info(self.url, title=self.comic_title, author=self.author_name)
+        if series['title']:
+            self.label = self.comic_title
+            self.log(f"Comic Title: {self.comic_title}")
+        else:
+            self.log("Could not find comic title.")
+        self.crawler.title(self.comic_title)
+        if series['author']:
+            self.log(f"Author: {self.author_name}")
+        else:
+            self.log("Could not find author information.")
+        self.log("Collecting episode list...")
+        for href, episode_title in series['episodes']:
+            self.add_episode(href, episode_title)
+        self.log(f"\nFound {len(self.episode_info_list)} episodes.")
+
+    def crawl_list(self):
+        crawler = self.crawler
+        metrics = crawler.metrics
+        try:
+            self.log(f"Fetching main page: {self.url}")
+            with metrics.timer('page_ready_seconds', series=self.url, stage='list', mode='http'):
+                series = crawl_series_http(
+                    crawler.session, self.url, lambda: self.running, crawler.host_limiter, retry_policy=self.retry_policy, log=self.log
+                )
+            if series is None:
+                self.log("Episode list pagination requires a browser.")
+            elif not series['episodes']:
+                self.log("No episodes found in the served HTML.")
+            else:
+                self.record_series(series)
+        except Exception as e:
+            if is_retryable(e):
+                self.log(f"Failed to fetch episode list: {str(e)}")
+                metrics.inc('failures_total', series=self.url, stage='list')
+                return
+            self.log(f"Failed to fetch episode list over HTTP: {str(e)}")
+
+        if not self.episode_info_list and self.running:
+            self.log("Falling back to Chrome for the episode list.")
+            from .browser import crawl_series_with_browser
+            pool = crawler.get_pool()
+            try:
+                self.log("Starting Chrome browser...")
+                driver = pool.acquire()
+                self.log("Chrome browser started successfully.")
+
+                with metrics.timer('page_ready_seconds', series=self.url, stage='list', mode='browser'):
+                    series = crawl_series_with_browser(driver, self.url, self.log, lambda: self.running)
+                self.record_series(series)
+            except Exception as e:
+                self.log(f"Error: {str(e)}")
+                metrics.inc('failures_total', series=self.url, stage='list')
+                list_crawl_failed = True
+            else:
+                list_crawl_failed = False
+            finally:
+                if 'driver' in locals():
+                    pool.release(driver, broken=list_crawl_failed)
+
+    def open_archive(self, recover):
+        try:
+            return SeriesArchive(self.zip_target)
+        except Exception as e:
+            self.log(f"Failed to read existing ZIP {self.zip_target}: {str(e)}")
+            if not recover:
+                return None
+        try:
+            recovered = recover_archive(self.zip_target)
+            self.log(f"Recovered {recovered} files from the damaged ZIP.")
+        except Exception as e:
+            self.log(f"Could not recover ZIP {self.zip_target}: {str(e)}")
+            if self.crawler.distributed:
+                return None
+            os.replace(self.zip_target, f"{self.zip_target}.corrupt")
+        return SeriesArchive(self.zip_target)
+
+    def prepare(self, recover=None):
+        if not self.running:
+            return False
+        self.episode_info_list.sort(key=lambda item: episode_sort_key(item['episode_num']))
+        for info in self.episode_info_list:
+            info['sanitized_episode'] = sanitize_path_component(info['episode_num'])
+
+        if not self.episode_info_list:
+            self.log("No episodes found.")
+            return False
+
+        sanitized_author = sanitize_path_component(self.author_name)
+        sanitized_comic_title = sanitize_path_component(self.comic_title)
+        self.base_dir_name = f"{sanitized_comic_title} by {sanitized_author}" if sanitized_author != "Unknown" else sanitized_comic_title
+        self.base_dir = os.path.join(self.crawler.output_dir, self.base_dir_name)
+        self.base_dir_path = os.path.abspath(self.base_dir)
+        self.zip_target = f"{self.base_dir_path}.zip"
+        self.archive = self.open_archive(not self.crawler.distributed if recover is None else recover)
+        if self.archive is None:
+            return False
+        if self.archive.entries:
+            self.log(f"Indexed {len(self.archive.entries)} files in existing ZIP.")
+        os.makedirs(self.base_dir, exist_ok=True)
+        self.manifest = CrawlManifest(
+            f"{self.base_dir}{MANIFEST_SUFFIX}", SHARED_JOURNAL_MODE if self.crawler.distributed else MANIFEST_JOURNAL_MODE
+        )
+
+        episodes_to_process = [info for info in self.episode_info_list if not self.episode_complete(info)]
+        skipped_episodes = len(self.episode_info_list) - len(episodes_to_process)
+        if skipped_episodes:
+            self.log(f"Skipping {skipped_episodes} episodes already complete in the manifest.")
+        self.pending.extend(episodes_to_process)
+        self.total = len(episodes_to_process)
+        self.crawler.metrics.series_info(self.url, episodes=len(self.episode_info_list), skipped_episodes=skipped_episodes)
+        return True
+
+    def archive_prefix(self, info):
+        return f"{self.base_dir_name}/{info['sanitized_episode']}/"
+
+    def processed_dir(self, info):
+        return os.path.join(self.base_dir_path, PROCESSED_DIR, info['sanitized_episode'])
+
+    def image_present(self, info, record):
+        if image_file_matches(os.path.join(self.base_dir, info['sanitized_episode']), record):
+            return True
+        if self.crawler.post_process:
+            # Only processed outputs reach the archive, so the originals must be on disk to be reused.
+            return False
+        return bool(record and record['filename']) and self.archive.contains(self.archive_prefix(info) + record['filename'], record['size'])
+
+    def output_present(self, info, record):
+        if image_file_matches(self.processed_dir(info), record):
+            return True
+        return self.archive.contains(self.archive_prefix(info) + record['filename'], record['size'])
+
+    def episode_files(self, info):
+        if self.crawler.post_process:
+            outputs = self.manifest.outputs(info['link'], self.crawler.post_process_signature)
+            if outputs:
+                return self.processed_dir(info), outputs
+        images = [image for image in self.manifest.images(info['link']).values() if image['filename']]
+        return os.path.join(self.base_dir_path, info['sanitized_episode']), images
+
+    def episode_complete(self, info):
+        record = self.manifest.episode(info['link'])
+        if not record or record['state'] != 'complete':
+            return False
+        if self.crawler.post_process:
+            outputs = self.manifest.outputs(info['link'], self.crawler.post_process_signature)
+            return bool(outputs) and all(self.output_present(info, output) for output in outputs)
+        images = self.manifest.images(info['link'])
+        return len(images) == record['expected_images'] and all(self.image_present(info, image) for image in images.values())
+
+    def submit_post_process(self, info, episode_dir):
+        images = self.manifest.images(info['link'])
+        filenames = [images[index]['filename'] for index in sorted(images)]
+        future = self.crawler.process_pool.submit(
+            process_episode_images, os.path.abspath(episode_dir), filenames, self.processed_dir(info), self.crawler.post_process
+        )
+        with self.processing_lock:
+            self.processing.append((info, future))
+
+    def collect_post_process(self, only=None):
+        with self.processing_lock:
+            processing = [item for item in self.processing if only is None or item[0] is only]
+            self.processing = [item for item in self.processing if only is not None and item[0] is not only]
+        metrics = self.crawler.metrics
+        for info, future in processing:
+            try:
+                source_bytes, outputs, elapsed = future.result()
+            except Exception as e:
+                self.log(f"Post-processing failed for {info['episode_num']}: {str(e)}")
+                metrics.inc('failures_total', series=self.url, stage='post_process')
+                continue
+            self.manifest.record_outputs(info['link'], self.crawler.post_process_signature, outputs)
+            output_bytes = sum(size for _, size in outputs)
+            metrics.observe('post_process_seconds', elapsed, series=self.url)
+            metrics.inc('post_process_bytes_total', source_bytes, series=self.url, side='input')
+            metrics.inc('post_process_bytes_total', output_bytes, series=self.url, side='output')
+            metrics.episode(self.url, info['episode_num'], post_process_seconds=elapsed, output_bytes=output_bytes)
+            self.log(f"Processed {info['episode_num']}: {len(outputs)} files, {source_bytes / 1024:.0f} KiB -> {output_bytes / 1024:.0f} KiB ({elapsed:.1f}s)")
+
+    def collect_image_urls_with_browser(self, info):
+        from .browser import collect_image_urls
+        link = info['link']
+        pool = self.crawler.get_pool()
+
+        def collect():
+            driver = pool.acquire()
+            broken = False
+            try:
+                with self.crawler.metrics.timer('page_ready_seconds', series=self.url, stage='episode', mode='browser'):
+                    return collect_image_urls(driver, link, self.log, lambda: self.running, self.crawler.scroll_for_images)
+            except Exception:
+                broken = True
+                raise
+            finally:
+                pool.release(driver, broken=broken)
+
+        return self.retry_policy.call(collect, 'browser', link, retryable=lambda e: self.running, on_retry=self.retry_logger(info['episode_num']))
+
+    def download_image(self, info, episode_dir, index, img_url, previous):
+        if not self.running:
+            self.crawler.image_done()
+            return None
+        metrics = self.crawler.metrics
+        if previous and previous['url'] == img_url and self.image_present(info, previous):
+            metrics.inc('images_total', series=self.url, result='unchanged')
+            self.crawler.image_done()
+            return previous['filename']
+        parsed_url = urlparse(img_url)
+        ext = os.path.splitext(parsed_url.path)[1].lower()
+        if ext not in IMAGE_EXTENSIONS:
+            ext = ''
+        cache = self.crawler.cache
+        stem = f"img_{index:04d}"
+        start = time.perf_counter()
+        result = 'downloaded'
+        def fetch(cached):
+            with self.crawler.host_limiter.slot(parsed_url.netloc):
+                headers = cache.validators(cached) if cached else {}
+                with self.crawler.session.get(img_url, timeout=30, stream=True, headers=headers) as img_response:
+                    if cached and img_response.status_code == 304:
+                        materialized = cache.materialize(cached, episode_dir, stem, revalidated=True)
+                        return materialized + ('revalidated',) if materialized else None
+                    img_response.raise_for_status()
+                    img_filename, size, sha256 = save_streamed_image(img_response, episode_dir, stem, ext)
+                    if cache:
+                        cache.store(
+                            os.path.join(episode_dir, img_filename), img_url, sha256, size,
+                            img_response.headers.get('ETag'), img_response.headers.get('Last-Modified')
+                        )
+                    return img_filename, size, sha256, 'downloaded'
+
+        try:
+            cached = cache.lookup(img_url) if cache else None
+            materialized = None
+            if cached and not cache.validators(cached):
+                materialized = cache.materialize(cached, episode_dir, stem)
+            if materialized:
+                img_filename, size, sha256 = materialized
+                result = 'cached'
+            else:
+                fetched = self.retry_policy.call(
+                    lambda: fetch(cached), 'image', img_url, on_retry=self.retry_logger(info['episode_num'])
+                )
+                if fetched is None:
+                    # The cached blob was evicted after revalidation; download it again.
+                    fetched = self.retry_policy.call(
+                        lambda: fetch(None), 'image', img_url, on_retry=self.retry_logger(info['episode_num'])
+                    )
+                img_filename, size, sha256, result = fetched
+            if previous and previous['filename'] and previous['filename'] != img_filename:
+                try:
+                    os.remove(os.path.join(episode_dir, previous['filename']))
+                except OSError:
+                    pass
+            self.manifest.record_image(info['link'], index, img_url, img_filename, size, sha256)
+            self.log(f"  Saved: {img_filename}")
+            return img_filename
+        except Exception as e:
+            self.log(f"  Failed to download image: {img_url} - {str(e)}")
+            result = 'failed'
+            size = 0
+            return None
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.observe('image_seconds', elapsed, series=self.url, result=result)
+            metrics.inc('images_total', series=self.url, result=result)
+            if size:
+                metrics.inc('image_bytes_total', size, series=self.url, source='network' if result == 'downloaded' else 'cache')
+            metrics.episode_add(self.url, info['episode_num'], image_seconds=elapsed, bytes=size or 0, failed_images=int(result == 'failed'))
+            self.crawler.image_done()
+
+    def process_episode(self, info):
+        if not self.running:
+            return
+        link = info['link']
+        local_comic_title = info['comic_title']
+        episode_num = info['episode_num']
+        self.log(f"\nProcessing {local_comic_title} {episode_num}: {link}")
+        episode_dir = os.path.join(self.base_dir, info['sanitized_episode'])
+        os.makedirs(episode_dir, exist_ok=True)
+        remove_partial_downloads(episode_dir)
+        metrics = self.crawler.metrics
+        episode_start = time.perf_counter()
+        try:
+            img_urls = []
+            stage_start = time.monotonic()
+            try:
+                with metrics.timer('page_ready_seconds', series=self.url, stage='episode', mode='http'):
+                    img_urls = parse_image_urls(fetch_html(self.crawler.session, link, self.crawler.host_limiter, self.retry_policy), link)
+            except Exception as e:
+                if is_retryable(e):
+                    raise
+                self.log(f"  Failed to fetch episode page over HTTP: {str(e)}")
+            used_browser = False
+            if img_urls:
+                self.log(f"  Found {len(img_urls)} images in the served HTML ({time.monotonic() - stage_start:.1f}s).")
+            else:
+                img_urls = self.collect_image_urls_with_browser(info)
+                used_browser = True
+            previous_images = self.manifest.images(link)
+            for index, image in previous_images.items():
+                if index >= len(img_urls) and image['filename']:
+                    try:
+                        os.remove(os.path.join(episode_dir, image['filename']))
+                    except OSError:
+                        pass
+            self.manifest.start_episode(link, episode_num, info['sanitized_episode'], len(img_urls))
+            self.crawler.add_images(len(img_urls))
+            image_futures = [
+                self.crawler.image_executor.submit(self.download_image, info, episode_dir, index, img_url, previous_images.get(index))
+                for index, img_url in enumerate(img_urls)
+            ]
+            img_count = sum(1 for future in image_futures if future.result())
+            state = 'complete' if img_urls and img_count == len(img_urls) else 'partial'
+            self.manifest.finish_episode(link, state)
+            if state != 'complete' and self.running:
+                self.failed.append(info)
+            metrics.inc('episodes_total', series=self.url, state=state)
+            metrics.episode(self.url, episode_num, images=len(img_urls), saved_images=img_count, state=state,
+                            mode='browser' if used_browser else 'http')
+            self.log(f"  Completed: Saved {img_count} images.")
+            if state == 'complete' and self.crawler.process_pool is not None and self.running:
+                self.submit_post_process(info, episode_dir)
+            if used_browser and self.crawler.block_resources:
+                saved_bytes = sum(image['size'] or 0 for image in self.manifest.images(link).values())
+                self.log(f"  Resource blocking kept {saved_bytes / 1024:.0f} KiB of images out of Chrome.")
+        except Exception as e:
+            self.log(f"  Error occurred: {str(e)}")
+            metrics.inc('failures_total', series=self.url, stage='episode')
+            metrics.inc('episodes_total', series=self.url, state='failed')
+            metrics.episode(self.url, episode_num, state='failed')
+            if self.running:
+                self.failed.append(info)
+        finally:
+            elapsed = time.perf_counter() - episode_start
+            metrics.observe('episode_seconds', elapsed, series=self.url)
+            metrics.episode_add(self.url, episode_num, seconds=elapsed)
+
+    def finish(self):
+        try:
+            self.collect_post_process()
+            if not self.running:
+                return None
+            with self.crawler.metrics.timer('package_seconds', series=self.url):
+                return self.package()
+        finally:
+            self.close()
+
+    def package(self):
+        archive = self.archive
+        manifest = self.manifest
+        new_files = {}
+        removed_entries = set()
+        updated_prefixes = []
+        for info in self.episode_info_list:
+            prefix = self.archive_prefix(info)
+            episode_dir, files = self.episode_files(info)
+            expected = {prefix + image['filename']: image for image in files}
+            record = manifest.episode(info['link'])
+            stale = []
+            if record and record['state'] == 'complete':
+                stale = [name for name in archive.names_under(prefix) if name not in expected]
+            added = False
+            if os.path.isdir(episode_dir):
+                for name in sorted(os.listdir(episode_dir)):
+                    arcname = prefix + name
+                    record = expected.get(arcname)
+                    if record and image_file_matches(episode_dir, record) and not archive.contains(arcname, record['size']):
+                        new_files[arcname] = os.path.join(episode_dir, name)
+                        added = True
+            removed_entries.update(stale)
+            if added or stale:
+                updated_prefixes.append((info, prefix))
+        try:
+            if new_files or removed_entries:
+                archive.update(new_files, removed_entries)
+                self.log(f"Updated ZIP: {len(new_files)} files added, {len(removed_entries)} removed ({self.zip_target})")
+            else:
+                self.log(f"ZIP already up to date: {self.zip_target}")
+        except Exception as e:
+            self.log(f"Failed to update ZIP: {str(e)}")
+            return None
+        if self.crawler.write_cbz and updated_prefixes:
+            cbz_dir = f"{self.base_dir_path} CBZ"
+            os.makedirs(cbz_dir, exist_ok=True)
+
+            def write_episode_cbz(item):
+                info, prefix = item
+                archive.write_cbz(prefix, os.path.join(cbz_dir, f"{info['sanitized_episode']}.cbz"))
+
+            with ThreadPoolExecutor(max_workers=self.crawler.concurrency) as executor:
+                cbz_futures = {executor.submit(write_episode_cbz, item): item[0] for item in updated_prefixes}
+                for future in as_completed(cbz_futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        self.log(f"Failed to write CBZ for {cbz_futures[future]['episode_num']}: {str(e)}")
+            self.log(f"Wrote {len(updated_prefixes)} CBZ files to {cbz_dir}")
+        try:
+            shutil.rmtree(self.base_dir_path)
+            self.log(f"Deleted original directory: {self.base_dir_path}")
+        except Exception as e:
+            self.log(f"Failed to delete original directory {self.base_dir_path}: {str(e)}")
+        self.log(f"\nAll tasks completed! ZIP saved at: {self.zip_target}")
+        return self.zip_target
+
+    def close(self):
+        if self.manifest is not None:
+            self.manifest.close()
+            self.manifest = None
+
+class Crawler:
+    def __init__(self, urls, output_dir='.', concurrency=EPISODE_CONCURRENCY, pool_size=DRIVER_POOL_SIZE, recycle_after=DRIVER_RECYCLE_AFTER,
+                 image_concurrency=IMAGE_CONCURRENCY, per_host_limit=IMAGE_PER_HOST_LIMIT, host_rate=HOST_RATE_LIMIT, write_cbz=False, scroll_for_images=False,
+                 cache_dir=IMAGE_CACHE_DIR, cache_max_bytes=IMAGE_CACHE_MAX_BYTES, block_resources=True, retries=RETRY_ATTEMPTS, retry_backoff=RETRY_BACKOFF,
+                 transcode=None, quality=POST_PROCESS_QUALITY, page_height=0, thumbnail_size=0, post_process_workers=None,
+                 on_log=None, on_progress=None, on_title=None, on_series_progress=None, on_image_progress=None):
+        self.urls = [urls] if isinstance(urls, str) else list(urls)
+        self.output_dir = output_dir
+        self.concurrency = max(1, concurrency)
+        self.image_concurrency = max(1, image_concurrency)
+        self.per_host_limit = per_host_limit
+        self.host_rate = host_rate
+        self.write_cbz = write_cbz
+        self.scroll_for_images = scroll_for_images
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+        self.block_resources = block_resources
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.post_process = post_process_options(transcode, quality, page_height, thumbnail_size)
+        self.post_process_signature = options_signature(self.post_process) if self.post_process else None
+        self.post_process_workers = post_process_workers
+        self.process_pool = None
+        self.pool_size = pool_size
+        self.recycle_after = recycle_after
+        self.on_log = on_log
+        self.on_progress = on_progress
+        self.on_title = on_title
+        self.on_series_progress = on_series_progress
+        self.on_image_progress = on_image_progress
+        self.image_lock = threading.Lock()
+        self.images_completed = 0
+        self.images_total = 0
+        self.metrics = Metrics()
+        self.distributed = False
+        self.running = True
+        self.pool = None
+        self.pool_lock = threading.Lock()
+
+    def log(self, message, series=None):
+        if not self.on_log:
+            return
+        if series is not None and len(self.urls) != 1:
+            stripped = message.lstrip('\n')
+            message = f"{message[:len(message) - len(stripped)]}[{series.label}] {stripped}"
+        self.on_log(message)
+
+    def progress(self, completed, total):
+        if self.on_progress:
+            self.on_progress(completed, total)
+
+    def series_progress(self, series):
+        if self.on_series_progress:
+            self.on_series_progress(series.url, series.label, series.completed, series.total)
+
+    def add_images(self, count):
+        with self.image_lock:
+            self.images_total += count
+            completed, total = self.images_completed, self.images_total
+        if self.on_image_progress:
+            self.on_image_progress(completed, total)
+
+    def image_done(self):
+        with self.image_lock:
+            self.images_completed += 1
+            completed, total = self.images_completed, self.images_total
+        if self.on_image_progress:
+            self.on_image_progress(completed, total)
+
+    def title(self, title):
+        if self.on_title:
+            self.on_title(title)
+
+    def stop(self):
+        self.running = False
+
+    def host_rate_changed(self, host, rate, tripped):
+        rate_text = f"{rate:g} requests/s" if rate else "no rate limit"
+        if tripped:
+            self.metrics.inc('breaker_trips_total', host=host)
+            self.log(f"Errors spiking on {host}; slowing to {rate_text}.")
+        else:
+            self.log(f"{host} recovered; raising to {rate_text}.")
+
+    def get_pool(self):
+        with self.pool_lock:
+            if self.pool is None:
+                from .browser import create_driver_factory
+                factory = create_driver_factory(self.block_resources)
+
+                def timed_factory():
+                    try:
+                        with self.metrics.timer('driver_start_seconds'):
+                            return factory()
+                    except Exception:
+                        self.metrics.inc('failures_total', stage='driver_start')
+                        raise
+
+                self.pool = DriverPool(timed_factory, self.pool_size, self.recycle_after)
+            return self.pool
+
+    def close_pool(self):
+        if self.pool is None:
+            return
+        self.pool.close()
+        stats = self.pool.stats()
+        self.log(f"Driver pool: {stats['startups']} started, {stats['reuses']} reused, {stats['recycles']} recycled.")
+        for name, value in stats.items():
+            self.metrics.inc(f"driver_{name}_total", value)
+
+    def close_cache(self):
+        if self.cache is None:
+            return
+        stats = self.cache.stats()
+        for name in ('hits', 'revalidated', 'misses', 'deduplicated', 'evicted'):
+            self.metrics.inc(f"cache_{name}_total", stats[name])
+        self.log(
+            f"Image cache: {stats['hits']} hits, {stats['revalidated']} revalidated, {stats['misses']} misses, "
+            f"{stats['deduplicated']} duplicate blobs, {stats['evicted']} evicted, {stats['bytes'] / 1048576:.1f} MiB stored."
+        )
+        self.cache.close()
+
+    def log_metrics(self):
+        stages = []
+        for name, (count, total) in sorted(self.metrics.totals().items()):
+            if count:
+                stages.append(f"{name[:-len('_seconds')]} {count} x {total / count:.2f}s")
+        if stages:
+            self.log(f"Stage timing: {', '.join(stages)}.")
+
+    def setup(self):
+        self.session = create_session(self.concurrency + self.image_concurrency)
+        self.host_limiter = HostLimiter(self.per_host_limit, self.host_rate, self.host_rate_changed)
+        self.image_executor = ThreadPoolExecutor(max_workers=self.image_concurrency)
+        self.cache = None
+        if self.cache_dir:
+            try:
+                self.cache = ImageCache(self.cache_dir, self.cache_max_bytes)
+            except Exception as e:
+                self.log(f"Image cache disabled: {str(e)}")
+        if self.post_process:
+            if pillow_available():
+                self.process_pool = ProcessPoolExecutor(
+                    max_workers=self.post_process_workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            else:
+                self.log("Post-processing disabled: Pillow is not installed.")
+                self.post_process = None
+
+    def teardown(self, series_list):
+        self.image_executor.shutdown(wait=True)
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=True, cancel_futures=not self.running)
+        for series in series_list:
+            series.close()
+        self.close_pool()
+        self.close_cache()
+        self.log_metrics()
+
+    def run(self):
+        self.setup()
+        series_list = [SeriesCrawl(self, url) for url in self.urls]
+        results = {url: None for url in self.urls}
+        pending_lists = deque(series_list)
+        pending_finish = deque()
+        ready = deque()
+        in_flight = {}
+        completed_episodes = 0
+        total_episodes = 0
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                def fill():
+                    while len(in_flight) < self.concurrency and self.running:
+                        if pending_finish:
+                            series = pending_finish.popleft()
+                            in_flight[executor.submit(series.finish)] = ('finish', series)
+                        elif pending_lists:
+                            series = pending_lists.popleft()
+                            in_flight[executor.submit(series.crawl_list)] = ('list', series)
+                        elif ready:
+                            series = ready.popleft()
+                            info = series.pending.popleft()
+                            if series.pending:
+                                ready.append(series)
+                            in_flight[executor.submit(series.process_episode, info)] = ('episode', series)
+                        else:
+                            break
+
+                try:
+                    fill()
+                    while in_flight:
+                        done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                        for future in done:
+                            kind, series = in_flight.pop(future)
+                            try:
+                                result = future.result()
+                            except Exception as e:
+                                self.log(f"{kind.capitalize()} worker failed: {str(e)}", series)
+                                result = None
+                            if kind == 'finish':
+                                results[series.url] = result
+                            elif kind == 'list':
+                                if series.prepare():
+                                    total_episodes += series.total
+                                    self.progress(completed_episodes, total_episodes)
+                                    self.series_progress(series)
+                                    if series.pending:
+                                        ready.append(series)
+                                    else:
+                                        pending_finish.append(series)
+                            else:
+                                series.completed += 1
+                                completed_episodes += 1
+                                self.progress(completed_episodes, total_episodes)
+                                self.series_progress(series)
+                                if series.completed == series.total:
+                                    requeued = series.requeue_failed()
+                                    if requeued:
+                                        total_episodes += requeued
+                                        self.progress(completed_episodes, total_episodes)
+                                        ready.append(series)
+                                    else:
+                                        pending_finish.append(series)
+                        fill()
+                except KeyboardInterrupt:
+                    self.stop()
+                    raise
+        finally:
+            self.teardown(series_list)
+        return results
+
+    def publish(self, queue):
+        self.distributed = True
+        self.setup()
+        series_list = [SeriesCrawl(self, url) for url in self.urls]
+        published = {url: None for url in self.urls}
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                try:
+                    list(executor.map(lambda series: series.crawl_list(), series_list))
+                except KeyboardInterrupt:
+                    self.stop()
+                    raise
+            for series in series_list:
+                if not series.prepare():
+                    continue
+                published[series.url] = queue.publish(series.url, series.queue_meta(), list(series.pending))
+                series.log(f"Published {published[series.url]} episodes to {queue.path}.")
+        finally:
+            self.teardown(series_list)
+        return published
+
+    def work(self, queue, worker_id=None, exit_when_idle=True):
+        worker_id = worker_id or default_worker_id()
+        self.distributed = True
+        self.setup()
+        self.log(f"Worker {worker_id} consuming {queue.path}")
+        loaded = {}
+        loaded_lock = threading.Lock()
+        results = {}
+        settled = [0]
+
+        def load_series(url, recover=False):
+            with loaded_lock:
+                series = loaded.get(url)
+                if series is None:
+                    meta = queue.series_meta(url)
+                    series = SeriesCrawl(self, url)
+                    if meta is None or not series.restore(meta, recover):
+                        series.close()
+                        return None
+                    loaded[url] = series
+                return series
+
+        def package_if_ready(url):
+            if not queue.claim_packaging(url, worker_id):
+                return
+            series = load_series(url, recover=True)
+            if series is None:
+                self.log(f"Could not load {url} for packaging; leaving it for another pass.")
+                queue.finish_packaging(url, False)
+                return
+            series.collect_post_process()
+            packaged = None
+            try:
+                series.archive = series.open_archive(recover=True)
+                if series.archive is None:
+                    raise RuntimeError(f"Unreadable ZIP {series.zip_target}")
+                with self.metrics.timer('package_seconds', series=url):
+                    packaged = series.package()
+            except Exception as e:
+                series.log(f"Packaging failed: {str(e)}")
+            finally:
+                queue.finish_packaging(url, packaged is not None)
+                results[url] = packaged
+                with loaded_lock:
+                    loaded.pop(url, None)
+                series.close()
+
+        def run_job(job):
+            series = load_series(job['series'])
+            if series is None:
+                self.log(f"Series {job['series']} is missing from the queue metadata.")
+                queue.nack(job['id'], worker_id)
+                return
+            info = next((item for item in series.episode_info_list if item['link'] == job['link']), None)
+            if info is None:
+                series.log(f"Episode {job['link']} is not part of the published series.")
+                queue.nack(job['id'], worker_id)
+                return
+            if job['redelivered']:
+                series.log(f"Re-delivered {info['episode_num']} after an expired lease (attempt {job['attempts']}).")
+
+            def lease_lost(job):
+                series.log(f"Lost the lease on {info['episode_num']}; another worker may take it over.")
+
+            with LeaseKeeper(queue, job, worker_id, lease_lost):
+                series.process_episode(info)
+                series.collect_post_process(info)
+            record = series.manifest.episode(info['link'])
+            if record and record['state'] == 'complete':
+                state = queue.ack(job['id'], worker_id)
+            else:
+                state = queue.nack(job['id'], worker_id)
+            if state == 'failed':
+                series.log(f"Giving up on {info['episode_num']} after {job['attempts']} attempts.")
+            settled[0] += 1
+            counts = queue.counts()
+            self.progress(settled[0], settled[0] + counts.get('queued', 0) + counts.get('leased', 0))
+            if state in ('done', 'failed'):
+                package_if_ready(job['series'])
+
+        def work_loop():
+            while self.running:
+                job = queue.lease(worker_id)
+                if job is not None:
+                    try:
+                        run_job(job)
+                    except Exception as e:
+                        self.log(f"Job {job['id']} failed: {str(e)}")
+                        queue.nack(job['id'], worker_id)
+                    continue
+                for url in queue.open_series():
+                    package_if_ready(url)
+                counts = queue.counts()
+                if exit_when_idle and not counts.get('queued') and not counts.get('leased'):
+                    return
+                deadline = time.monotonic() + WORKER_POLL_INTERVAL
+                while self.running and time.monotonic() < deadline:
+                    time.sleep(0.25)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                try:
+                    for future in [executor.submit(work_loop) for _ in range(self.concurrency)]:
+                        future.result()
+                except KeyboardInterrupt:
+                    self.stop()
+                    raise
+        finally:
+            self.teardown(list(loaded.values()))
+        return results
@@ -0,0 +1,391 @@
+import os
+import time
+import random
+import mimetypes
+import tempfile
+import hashlib
+import threading
+from collections import deque
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urljoin, urlparse, urlunparse, parse_qsl, urlencode
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+HTTP_TIMEOUT = 15
+LIST_PAGE_CONCURRENCY = 4
+IMAGE_CONCURRENCY = 8
+IMAGE_PER_HOST_LIMIT = 4
+HOST_RATE_LIMIT = 10
+IMAGE_CHUNK_SIZE = 64 * 1024
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.jpe', '.png', '.gif', '.bmp', '.webp', '.avif'}
+IMAGE_SIGNATURES = [
+    (b'\xff\xd8\xff', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', '.png'),
+    (b'GIF87a', '.gif'),
+    (b'GIF89a', '.gif'),
+    (b'BM', '.bmp')
+]
+PARTIAL_SUFFIX = '.part'
+RETRY_ATTEMPTS = 4
+RETRY_BACKOFF = 0.5
+RETRY_BACKOFF_MAX = 30
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+BREAKER_WINDOW = 20
+BREAKER_ERROR_RATIO = 0.5
+BREAKER_COOLDOWN = 30
+BREAKER_MIN_RATE = 0.5
+BREAKER_FALLBACK_RATE = 10
+
+EPISODE_LINK_SELECTOR = "li a[href*='/detail/']"
+EPISODE_TITLE_SELECTORS = [
+    "h1.m-episode-list-item-title",
+    "div.dt-le-c h1[title]",
+    "h1[title]"
+]
+PAGINATION_SELECTORS = [
+    ".mPagination button[data-page]",
+    ".m-pagination button[data-page]",
+    ".mf-Pagination-wrap button[data-page]"
+]
+ACTIVE_PAGE_SELECTOR = ".mPagination button.active, .m-pagination button.active, .mf-Pagination-wrap button.active"
+
+def create_session(pool_maxsize):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, pool_maxsize))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+class RateLimiter:
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, rate or 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                if not self.rate:
+                    return
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def set_rate(self, rate):
+        with self.lock:
+            self.rate = rate
+            self.capacity = max(1, rate or 1)
+            self.tokens = min(self.tokens, self.capacity)
+            self.updated = time.monotonic()
+
+class IncompleteDownload(IOError):
+    pass
+
+def is_retryable(error):
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code in RETRYABLE_STATUS
+    return isinstance(error, (
+        IncompleteDownload, requests.ConnectionError, requests.Timeout,
+        requests.exceptions.ChunkedEncodingError, requests.exceptions.ContentDecodingError
+    ))
+
+def retry_after_seconds(response):
+    value = (response.headers.get('Retry-After') or '').strip() if response is not None else ''
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class RetryPolicy:
+    def __init__(self, attempts=RETRY_ATTEMPTS, backoff=RETRY_BACKOFF, backoff_max=RETRY_BACKOFF_MAX, on_retry=None, is_running=lambda: True):
+        self.attempts = max(1, attempts)
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.on_retry = on_retry
+        self.is_running = is_running
+
+    def delay(self, attempt, error):
+        retry_after = retry_after_seconds(getattr(error, 'response', None))
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+
+    def sleep(self, delay):
+        deadline = time.monotonic() + delay
+        while self.is_running():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            time.sleep(min(remaining, 0.25))
+        return False
+
+    def call(self, func, stage, target, retryable=is_retryable, on_retry=None):
+        on_retry = on_retry or self.on_retry
+        attempt = 0
+        while True:
+            try:
+                return func()
+            except Exception as e:
+                attempt += 1
+                if attempt >= self.attempts or not retryable(e):
+                    raise
+                delay = self.delay(attempt - 1, e)
+                if on_retry:
+                    on_retry(stage, target, attempt, delay, e)
+                if not self.sleep(delay):
+                    raise
+
+class CircuitBreaker:
+    def __init__(self, rate_limiter, window=BREAKER_WINDOW, threshold=BREAKER_ERROR_RATIO, cooldown=BREAKER_COOLDOWN):
+        self.rate_limiter = rate_limiter
+        self.base_rate = rate_limiter.rate
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.outcomes = deque(maxlen=window)
+        self.lock = threading.Lock()
+        self.slowed_until = 0
+        self.trips = 0
+
+    def record(self, failed):
+        with self.lock:
+            now = time.monotonic()
+            self.outcomes.append(failed)
+            current_rate = self.rate_limiter.rate
+            if failed:
+                if len(self.outcomes) < self.outcomes.maxlen // 2 or sum(self.outcomes) / len(self.outcomes) < self.threshold:
+                    return None, False
+                new_rate = max(BREAKER_MIN_RATE, (current_rate or BREAKER_FALLBACK_RATE) / 2)
+                self.outcomes.clear()
+                self.trips += 1
+                tripped = True
+            else:
+                if not self.trips or now < self.slowed_until or current_rate == self.base_rate:
+                    return None, False
+                new_rate = current_rate * 2
+                if new_rate >= (self.base_rate or BREAKER_FALLBACK_RATE):
+                    new_rate = self.base_rate
+                tripped = False
+            self.slowed_until = now + self.cooldown
+            self.rate_limiter.set_rate(new_rate)
+            return new_rate, tripped
+
+class HostLimiter:
+    def __init__(self, limit, rate=None, on_rate_change=None):
+        self.limit = limit
+        self.rate = rate
+        self.on_rate_change = on_rate_change
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def host(self, host):
+        with self.lock:
+            entry = self.hosts.get(host)
+            if entry is None:
+                semaphore = threading.BoundedSemaphore(self.limit) if self.limit else None
+                rate_limiter = RateLimiter(self.rate)
+                entry = self.hosts[host] = (semaphore, rate_limiter, CircuitBreaker(rate_limiter))
+        return entry
+
+    def record(self, host, breaker, error):
+        new_rate, tripped = breaker.record(error is not None and is_retryable(error))
+        if new_rate is not None and self.on_rate_change:
+            self.on_rate_change(host, new_rate, tripped)
+
+    @contextmanager
+    def slot(self, host):
+        semaphore, rate_limiter, breaker = self.host(host)
+        if semaphore is not None:
+            semaphore.acquire()
+        try:
+            rate_limiter.acquire()
+            try:
+                yield
+            except Exception as e:
+                self.record(host, breaker, e)
+                raise
+            self.record(host, breaker, None)
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+
+def sniff_image_extension(head):
+    for signature, ext in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return ext
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return '.webp'
+    if head[4:12] in (b'ftypavif', b'ftypavis'):
+        return '.avif'
+    return ''
+
+def extension_from_content_type(content_type):
+    if not content_type.startswith('image/'):
+        return ''
+    guessed_ext = mimetypes.guess_extension(content_type.split(';')[0].strip())
+    if guessed_ext == '.jpe':
+        guessed_ext = '.jpg'
+    return guessed_ext if guessed_ext in IMAGE_EXTENSIONS else ''
+
+def save_streamed_image(response, directory, stem, ext=''):
+    fd, temp_path = tempfile.mkstemp(prefix=f".{stem}.", suffix=PARTIAL_SUFFIX, dir=directory)
+    digest = hashlib.sha256()
+    written = 0
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in response.iter_content(IMAGE_CHUNK_SIZE):
+                if not chunk:
+                    continue
+                if not written and not ext:
+                    ext = sniff_image_extension(chunk)
+                f.write(chunk)
+                digest.update(chunk)
+                written += len(chunk)
+        expected_length = response.headers.get('Content-Length', '')
+        encoding = response.headers.get('Content-Encoding', 'identity')
+        if expected_length.isdigit() and encoding == 'identity' and int(expected_length) != written:
+            raise IncompleteDownload(f"Incomplete download: got {written} of {expected_length} bytes")
+        if not ext:
+            ext = extension_from_content_type(response.headers.get('Content-Type', '')) or '.jpg'
+        filename = f"{stem}{ext}"
+        os.replace(temp_path, os.path.join(directory, filename))
+        return filename, written, digest.hexdigest()
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def remove_partial_downloads(directory):
+    for name in os.listdir(directory):
+        if name.endswith(PARTIAL_SUFFIX):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+def fetch_html(session, url, host_limiter=None, retry_policy=None):
+    def fetch():
+        if host_limiter is None:
+            response = session.get(url, timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
+            return response.content
+        with host_limiter.slot(urlparse(url).netloc):
+            response = session.get(url, timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
+            return response.content
+
+    if retry_policy is None:
+        return fetch()
+    return retry_policy.call(fetch, 'page', url)
+
+def page_url(url, page_value):
+    parsed = urlparse(url)
+    query = [(key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True) if key != 'page']
+    query.append(('page', page_value))
+    return urlunparse(parsed._replace(query=urlencode(query)))
+
+def parse_series_page(html, base_url):
+    soup = BeautifulSoup(html, 'lxml')
+    title_element = soup.select_one("div.dt-left-tt h1")
+    author_element = soup.select_one("div.detail-title1 a.m-episode-link")
+    episodes = []
+    for ep_link in soup.select(EPISODE_LINK_SELECTOR):
+        href = ep_link.get('href')
+        if not href:
+            continue
+        title_element_ = None
+        for selector in EPISODE_TITLE_SELECTORS:
+            title_element_ = ep_link.select_one(selector)
+            if title_element_ is not None:
+                break
+        if title_element_ is None:
+            continue
+        episode_title = title_element_.get_text(strip=True) or (title_element_.get('title') or "").strip()
+        if episode_title:
+            episodes.append((urljoin(base_url, href), episode_title))
+    pages = []
+    for selector in PAGINATION_SELECTORS:
+        for button in soup.select(selector):
+            page_value = button.get('data-page')
+            if page_value and page_value.isdigit() and page_value not in pages:
+                pages.append(page_value)
+    active_button = soup.select_one(ACTIVE_PAGE_SELECTOR)
+    return {
+        'title': title_element.get_text(strip=True) if title_element is not None else "",
+        'author': author_element.get_text(strip=True) if author_element is not None else "",
+        'episodes': episodes,
+        'pages': pages,
+        'active_page': active_button.get('data-page') if active_button is not None else None
+    }
+
+def parse_image_urls(html, base_url):
+    soup = BeautifulSoup(html, 'lxml')
+    img_urls = []
+    for wrap in soup.select(".lazy-img-wrap"):
+        img_tag = wrap.find('img')
+        img_url = None
+        if img_tag is not None:
+            img_url = img_tag.get('data-src') or img_tag.get('data-original') or img_tag.get('src')
+        if not img_url:
+            img_url = wrap.get('data-src') or wrap.get('data-original')
+        if img_url:
+            img_urls.append(urljoin(base_url, img_url))
+    return img_urls
+
+def crawl_series_http(session, url, is_running=lambda: True, host_limiter=None, concurrency=LIST_PAGE_CONCURRENCY, retry_policy=None, log=None):
+    first_page = parse_series_page(fetch_html(session, url, host_limiter, retry_policy), url)
+    first_page_value = first_page['active_page'] or '1'
+    pages = {first_page_value: first_page}
+    first_links = {href for href, _ in first_page['episodes']}
+    frontier = set(first_page['pages']) - {first_page_value}
+    failed_pages = set()
+
+    def fetch_page(page_value):
+        return parse_series_page(fetch_html(session, page_url(url, page_value), host_limiter, retry_policy), url)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        in_flight = {}
+        while (frontier or in_flight) and is_running():
+            for page_value in frontier:
+                in_flight[executor.submit(fetch_page, page_value)] = page_value
+            frontier = set()
+            done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            for future in done:
+                page_value = in_flight.pop(future)
+                try:
+                    page = future.result()
+                except Exception as e:
+                    if log:
+                        log(f"Failed to fetch page {page_value}: {str(e)}")
+                    failed_pages.add(page_value)
+                    continue
+                if page['episodes'] and all(href in first_links for href, _ in page['episodes']):
+                    # The server ignored the page parameter; only a browser can follow this pagination.
+                    for pending in in_flight:
+                        pending.cancel()
+                    return None
+                pages[page_value] = page
+                frontier.update(page['pages'])
+            frontier -= set(pages) | set(in_flight.values()) | failed_pages
+    return {
+        'title': first_page['title'],
+        'author': first_page['author'],
+        'episodes': [episode for page_value in sorted(pages, key=int) for episode in pages[page_value]['episodes']]
+    }
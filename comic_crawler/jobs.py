@@ -0,0 +1,198 @@
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+from .storage import SHARED_JOURNAL_MODE
+
+JOB_LEASE_SECONDS = 300
+JOB_MAX_ATTEMPTS = 3
+WORKER_POLL_INTERVAL = 2
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class JobQueue:
+    def __init__(self, path, lease_seconds=JOB_LEASE_SECONDS, max_attempts=JOB_MAX_ATTEMPTS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=60, check_same_thread=False, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        with self.lock:
+            self.connection.execute(f"PRAGMA journal_mode={SHARED_JOURNAL_MODE}")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS series ("
+                "url TEXT PRIMARY KEY, meta TEXT, state TEXT, packaged_by TEXT, updated REAL)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, series TEXT, link TEXT, payload TEXT, state TEXT, "
+                "attempts INTEGER DEFAULT 0, worker TEXT, lease_until REAL, updated REAL, "
+                "UNIQUE (series, link))"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, lease_until)")
+
+    def transaction(self, sql_callback):
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = sql_callback(self.connection)
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+            return result
+
+    def publish(self, series_url, meta, infos):
+        now = time.time()
+
+        def publish(connection):
+            connection.execute(
+                "INSERT INTO series (url, meta, state, packaged_by, updated) VALUES (?, ?, 'open', NULL, ?) "
+                "ON CONFLICT(url) DO UPDATE SET meta = excluded.meta, state = 'open', packaged_by = NULL, updated = excluded.updated",
+                (series_url, json.dumps(meta, ensure_ascii=False), now)
+            )
+            published = 0
+            for info in infos:
+                cursor = connection.execute(
+                    "INSERT INTO jobs (series, link, payload, state, attempts, updated) VALUES (?, ?, ?, 'queued', 0, ?) "
+                    "ON CONFLICT(series, link) DO UPDATE SET payload = excluded.payload, state = 'queued', attempts = 0, "
+                    "worker = NULL, lease_until = NULL, updated = excluded.updated WHERE jobs.state != 'leased'",
+                    (series_url, info['link'], json.dumps(info, ensure_ascii=False), now)
+                )
+                published += cursor.rowcount
+            return published
+
+        return self.transaction(publish)
+
+    def series_meta(self, series_url):
+        with self.lock:
+            row = self.connection.execute("SELECT meta FROM series WHERE url = ?", (series_url,)).fetchone()
+        return json.loads(row['meta']) if row else None
+
+    def lease(self, worker):
+        now = time.time()
+
+        def lease(connection):
+            connection.execute(
+                "UPDATE jobs SET state = 'failed', worker = NULL, lease_until = NULL, updated = ? "
+                "WHERE state = 'leased' AND lease_until < ? AND attempts >= ?",
+                (now, now, self.max_attempts)
+            )
+            row = connection.execute(
+                "SELECT * FROM jobs WHERE state = 'queued' OR (state = 'leased' AND lease_until < ?) ORDER BY id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE jobs SET state = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1, updated = ? WHERE id = ?",
+                (worker, now + self.lease_seconds, now, row['id'])
+            )
+            job = dict(row)
+            job['attempts'] += 1
+            job['redelivered'] = row['state'] == 'leased'
+            job['info'] = json.loads(row['payload'])
+            return job
+
+        return self.transaction(lease)
+
+    def heartbeat(self, job_id, worker):
+        now = time.time()
+        with self.lock:
+            cursor = self.connection.execute(
+                "UPDATE jobs SET lease_until = ?, updated = ? WHERE id = ? AND worker = ? AND state = 'leased'",
+                (now + self.lease_seconds, now, job_id, worker)
+            )
+        return cursor.rowcount == 1
+
+    def ack(self, job_id, worker):
+        return self.settle(job_id, worker, 'done')
+
+    def nack(self, job_id, worker):
+        return self.settle(job_id, worker, None)
+
+    def settle(self, job_id, worker, state):
+        now = time.time()
+
+        def settle(connection):
+            row = connection.execute("SELECT attempts FROM jobs WHERE id = ? AND worker = ? AND state = 'leased'", (job_id, worker)).fetchone()
+            if row is None:
+                return None
+            new_state = state or ('failed' if row['attempts'] >= self.max_attempts else 'queued')
+            connection.execute(
+                "UPDATE jobs SET state = ?, worker = NULL, lease_until = NULL, updated = ? WHERE id = ?",
+                (new_state, now, job_id)
+            )
+            return new_state
+
+        return self.transaction(settle)
+
+    def claim_packaging(self, series_url, worker):
+        now = time.time()
+
+        def claim(connection):
+            unsettled = connection.execute(
+                "SELECT COUNT(*) FROM jobs WHERE series = ? AND state NOT IN ('done', 'failed')", (series_url,)
+            ).fetchone()[0]
+            if unsettled:
+                return False
+            cursor = connection.execute(
+                "UPDATE series SET state = 'packaging', packaged_by = ?, updated = ? WHERE url = ? AND state = 'open'",
+                (worker, now, series_url)
+            )
+            return cursor.rowcount == 1
+
+        return self.transaction(claim)
+
+    def finish_packaging(self, series_url, packaged):
+        with self.lock:
+            self.connection.execute(
+                "UPDATE series SET state = ?, updated = ? WHERE url = ?",
+                ('packaged' if packaged else 'open', time.time(), series_url)
+            )
+
+    def open_series(self):
+        with self.lock:
+            return [row['url'] for row in self.connection.execute("SELECT url FROM series WHERE state = 'open'").fetchall()]
+
+    def counts(self):
+        with self.lock:
+            rows = self.connection.execute("SELECT state, COUNT(*) AS count FROM jobs GROUP BY state").fetchall()
+        return {row['state']: row['count'] for row in rows}
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+class LeaseKeeper:
+    def __init__(self, queue, job, worker, on_lost=None):
+        self.queue = queue
+        self.job = job
+        self.worker = worker
+        self.on_lost = on_lost
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        interval = max(1, self.queue.lease_seconds / 3)
+        while not self.stopped.wait(interval):
+            try:
+                alive = self.queue.heartbeat(self.job['id'], self.worker)
+            except Exception:
+                continue
+            if not alive:
+                if self.on_lost:
+                    self.on_lost(self.job)
+                return
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
@@ -0,0 +1,147 @@
+import time
+import json
+import threading
+from contextlib import contextmanager
+
+METRIC_PREFIX = 'comic_crawler_'
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[position] += 1
+                break
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else None,
+            'min': self.min,
+            'max': self.max
+        }
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{escape_label(value)}"' for key, value in pairs) + '}'
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.counters = {}
+        self.histograms = {}
+        self.series = {}
+        self.episodes = {}
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def series_info(self, series, **values):
+        with self.lock:
+            self.series.setdefault(series, {}).update(values)
+
+    def episode(self, series, episode, **values):
+        with self.lock:
+            self.episodes.setdefault(series, {}).setdefault(episode, {}).update(values)
+
+    def episode_add(self, series, episode, **values):
+        with self.lock:
+            record = self.episodes.setdefault(series, {}).setdefault(episode, {})
+            for key, value in values.items():
+                record[key] = record.get(key, 0) + value
+
+    def totals(self):
+        totals = {}
+        with self.lock:
+            for (name, _), histogram in self.histograms.items():
+                count, total = totals.get(name, (0, 0.0))
+                totals[name] = (count + histogram.count, total + histogram.sum)
+        return totals
+
+    def summary(self):
+        with self.lock:
+            counters = {}
+            for (name, labels), value in sorted(self.counters.items()):
+                counters.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+            histograms = {}
+            for (name, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+                entry = histogram.summary()
+                entry['labels'] = dict(labels)
+                histograms.setdefault(name, []).append(entry)
+            series = {}
+            for url in sorted(set(self.series) | set(self.episodes)):
+                series[url] = dict(self.series.get(url, {}))
+                series[url]['episodes'] = {episode: dict(values) for episode, values in self.episodes.get(url, {}).items()}
+            return {
+                'started': round(self.started, 3),
+                'elapsed': round(time.time() - self.started, 3),
+                'counters': counters,
+                'histograms': histograms,
+                'series': series
+            }
+
+    def to_json(self):
+        return json.dumps(self.summary(), ensure_ascii=False, indent=2)
+
+    def prometheus(self):
+        lines = []
+        with self.lock:
+            counter_names = sorted({name for name, _ in self.counters})
+            for name in counter_names:
+                metric = f"{METRIC_PREFIX}{name}"
+                lines.append(f"# TYPE {metric} counter")
+                for (key_name, labels), value in sorted(self.counters.items()):
+                    if key_name == name:
+                        lines.append(f"{metric}{format_labels(labels)} {value}")
+            histogram_names = sorted({name for name, _ in self.histograms})
+            for name in histogram_names:
+                metric = f"{METRIC_PREFIX}{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                for (key_name, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+                    if key_name != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{metric}_bucket{format_labels(labels, [('le', bound)])} {cumulative}")
+                    lines.append(f"{metric}_bucket{format_labels(labels, [('le', '+Inf')])} {histogram.count}")
+                    lines.append(f"{metric}_sum{format_labels(labels)} {histogram.sum:.6f}")
+                    lines.append(f"{metric}_count{format_labels(labels)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,86 @@
+import queue
+import threading
+
+DRIVER_POOL_SIZE = 3
+DRIVER_RECYCLE_AFTER = 25
+
+class DriverPool:
+    def __init__(self, factory, size=DRIVER_POOL_SIZE, recycle_after=DRIVER_RECYCLE_AFTER):
+        self.factory = factory
+        self.size = max(1, size)
+        self.recycle_after = max(1, recycle_after)
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(self.size)
+        self.lock = threading.Lock()
+        self.uses = {}
+        self.closed = False
+        self.startups = 0
+        self.reuses = 0
+        self.recycles = 0
+
+    def acquire(self):
+        self.slots.acquire()
+        try:
+            driver = self.idle.get_nowait()
+        except queue.Empty:
+            driver = None
+        if driver is not None:
+            with self.lock:
+                self.reuses += 1
+            return driver
+        try:
+            driver = self.factory()
+        except Exception:
+            self.slots.release()
+            raise
+        with self.lock:
+            self.startups += 1
+            self.uses[driver] = 0
+        return driver
+
+    def release(self, driver, broken=False):
+        try:
+            with self.lock:
+                self.uses[driver] = self.uses.get(driver, 0) + 1
+                expired = self.uses[driver] >= self.recycle_after
+                closed = self.closed
+            if not broken and not expired and not closed:
+                try:
+                    self.reset(driver)
+                    self.idle.put(driver)
+                    return
+                except Exception:
+                    pass
+            if not closed:
+                with self.lock:
+                    self.recycles += 1
+            self.discard(driver)
+        finally:
+            self.slots.release()
+
+    def reset(self, driver):
+        driver.execute_script("try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}")
+        driver.delete_all_cookies()
+        driver.get('about:blank')
+
+    def discard(self, driver):
+        with self.lock:
+            self.uses.pop(driver, None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+        while True:
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            self.discard(driver)
+
+    def stats(self):
+        with self.lock:
+            return {'startups': self.startups, 'reuses': self.reuses, 'recycles': self.recycles}
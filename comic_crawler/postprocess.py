@@ -0,0 +1,135 @@
+import os
+import time
+import json
+import shutil
+import importlib.util
+from .fetch import PARTIAL_SUFFIX
+
+POST_PROCESS_FORMATS = ('webp', 'avif')
+POST_PROCESS_QUALITY = 80
+THUMBNAIL_NAME = 'thumbnail'
+PROCESSED_DIR = '.processed'
+SAVE_OPTIONS = {
+    'webp': lambda quality: {'format': 'WEBP', 'quality': quality, 'method': 4},
+    'avif': lambda quality: {'format': 'AVIF', 'quality': quality},
+    'jpg': lambda quality: {'format': 'JPEG', 'quality': quality, 'optimize': True}
+}
+
+def post_process_options(transcode=None, quality=POST_PROCESS_QUALITY, page_height=0, thumbnail_size=0):
+    if not transcode and not page_height and not thumbnail_size:
+        return None
+    if transcode and transcode not in POST_PROCESS_FORMATS:
+        raise ValueError(f"Unsupported transcode format: {transcode}")
+    return {
+        'transcode': transcode or None,
+        'quality': quality,
+        'page_height': page_height or 0,
+        'thumbnail_size': thumbnail_size or 0
+    }
+
+def options_signature(options):
+    return json.dumps(options, sort_keys=True)
+
+def pillow_available():
+    return importlib.util.find_spec('PIL') is not None
+
+def output_format(options):
+    if options['transcode']:
+        return options['transcode']
+    if options['page_height']:
+        return 'jpg'
+    return None
+
+def save_image(image, directory, stem, fmt, quality):
+    filename = f"{stem}.{fmt}"
+    temp_path = os.path.join(directory, f".{filename}{PARTIAL_SUFFIX}")
+    if image.mode not in ('RGB', 'RGBA') or (fmt == 'jpg' and image.mode != 'RGB'):
+        image = image.convert('RGB')
+    image.save(temp_path, **SAVE_OPTIONS[fmt](quality))
+    os.replace(temp_path, os.path.join(directory, filename))
+    return filename
+
+def split_into_pages(images, page_height):
+    from PIL import Image
+    width = None
+    pending = []
+    pending_height = 0
+    for image in images:
+        if width is None:
+            width = image.width
+        if image.width != width:
+            image = image.resize((width, max(1, round(image.height * width / image.width))))
+        top = 0
+        while top < image.height:
+            take = min(page_height - pending_height, image.height - top)
+            pending.append(image.crop((0, top, width, top + take)))
+            pending_height += take
+            top += take
+            if pending_height == page_height:
+                page = Image.new('RGB', (width, page_height), 'white')
+                offset = 0
+                for piece in pending:
+                    page.paste(piece, (0, offset))
+                    offset += piece.height
+                yield page
+                pending = []
+                pending_height = 0
+    if pending:
+        page = Image.new('RGB', (width, pending_height), 'white')
+        offset = 0
+        for piece in pending:
+            page.paste(piece, (0, offset))
+            offset += piece.height
+        yield page
+
+def process_episode_images(source_dir, filenames, output_dir, options):
+    from PIL import Image
+    start = time.perf_counter()
+    if options['transcode'] == 'avif':
+        try:
+            importlib.import_module('pillow_avif')
+        except ImportError:
+            pass
+
+    if os.path.isdir(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir)
+    fmt = output_format(options)
+    outputs = []
+    first_page = None
+
+    def load(filename):
+        with Image.open(os.path.join(source_dir, filename)) as image:
+            image.load()
+            return image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') and fmt != 'jpg' else 'RGB')
+
+    if options['page_height']:
+        pages = split_into_pages((load(filename) for filename in filenames), options['page_height'])
+        for index, page in enumerate(pages, 1):
+            outputs.append(save_image(page, output_dir, f"page_{index:04d}", fmt, options['quality']))
+            if first_page is None:
+                first_page = page
+    else:
+        for filename in filenames:
+            stem = os.path.splitext(filename)[0]
+            if fmt:
+                image = load(filename)
+                outputs.append(save_image(image, output_dir, stem, fmt, options['quality']))
+            else:
+                image = None
+                try:
+                    os.link(os.path.join(source_dir, filename), os.path.join(output_dir, filename))
+                except OSError:
+                    shutil.copyfile(os.path.join(source_dir, filename), os.path.join(output_dir, filename))
+                outputs.append(filename)
+            if first_page is None:
+                first_page = image if image is not None else load(filename)
+
+    if options['thumbnail_size'] and first_page is not None:
+        thumbnail = first_page.copy()
+        thumbnail.thumbnail((options['thumbnail_size'], options['thumbnail_size'] * 2))
+        outputs.append(save_image(thumbnail, output_dir, THUMBNAIL_NAME, fmt or 'jpg', options['quality']))
+
+    source_bytes = sum(os.path.getsize(os.path.join(source_dir, filename)) for filename in filenames)
+    outputs = [(name, os.path.getsize(os.path.join(output_dir, name))) for name in outputs]
+    return source_bytes, outputs, time.perf_counter() - start
@@ -0,0 +1,177 @@
+import os
+import time
+import zlib
+import struct
+import shutil
+import sqlite3
+import threading
+import zipfile
+from .fetch import IMAGE_CHUNK_SIZE, IMAGE_EXTENSIONS, PARTIAL_SUFFIX
+
+MANIFEST_SUFFIX = '.manifest.sqlite'
+LOCAL_HEADER = struct.Struct('<4sHHHHHIIIHH')
+LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+MANIFEST_JOURNAL_MODE = 'WAL'
+SHARED_JOURNAL_MODE = 'DELETE'
+
+class CrawlManifest:
+    def __init__(self, path, journal_mode=MANIFEST_JOURNAL_MODE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        with self.lock, self.connection:
+            self.connection.execute(f"PRAGMA journal_mode={journal_mode}")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS episodes ("
+                "link TEXT PRIMARY KEY, title TEXT, directory TEXT, "
+                "expected_images INTEGER, state TEXT, updated REAL)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS images ("
+                "link TEXT, idx INTEGER, url TEXT, filename TEXT, size INTEGER, sha256 TEXT, "
+                "PRIMARY KEY (link, idx))"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS outputs ("
+                "link TEXT, idx INTEGER, filename TEXT, size INTEGER, settings TEXT, "
+                "PRIMARY KEY (link, idx))"
+            )
+
+    def episode(self, link):
+        with self.lock:
+            row = self.connection.execute("SELECT * FROM episodes WHERE link = ?", (link,)).fetchone()
+        return dict(row) if row else None
+
+    def images(self, link):
+        with self.lock:
+            rows = self.connection.execute("SELECT * FROM images WHERE link = ? ORDER BY idx", (link,)).fetchall()
+        return {row['idx']: dict(row) for row in rows}
+
+    def start_episode(self, link, title, directory, expected_images):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO episodes (link, title, directory, expected_images, state, updated) VALUES (?, ?, ?, ?, 'in_progress', ?) "
+                "ON CONFLICT(link) DO UPDATE SET title = excluded.title, directory = excluded.directory, "
+                "expected_images = excluded.expected_images, state = excluded.state, updated = excluded.updated",
+                (link, title, directory, expected_images, time.time())
+            )
+            self.connection.execute("DELETE FROM images WHERE link = ? AND idx >= ?", (link, expected_images))
+
+    def record_image(self, link, index, url, filename, size, sha256):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO images (link, idx, url, filename, size, sha256) VALUES (?, ?, ?, ?, ?, ?)",
+                (link, index, url, filename, size, sha256)
+            )
+
+    def outputs(self, link, settings):
+        with self.lock:
+            rows = self.connection.execute("SELECT * FROM outputs WHERE link = ? ORDER BY idx", (link,)).fetchall()
+        if not rows or any(row['settings'] != settings for row in rows):
+            return None
+        return [dict(row) for row in rows]
+
+    def record_outputs(self, link, settings, outputs):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM outputs WHERE link = ?", (link,))
+            self.connection.executemany(
+                "INSERT INTO outputs (link, idx, filename, size, settings) VALUES (?, ?, ?, ?, ?)",
+                [(link, index, filename, size, settings) for index, (filename, size) in enumerate(outputs)]
+            )
+
+    def finish_episode(self, link, state):
+        with self.lock, self.connection:
+            self.connection.execute("UPDATE episodes SET state = ?, updated = ? WHERE link = ?", (state, time.time(), link))
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+def image_file_matches(directory, record):
+    if not record or not record['filename']:
+        return False
+    try:
+        return os.path.getsize(os.path.join(directory, record['filename'])) == record['size']
+    except OSError:
+        return False
+
+def archive_compression(name):
+    if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+def recover_archive(path):
+    temp_path = f"{path}{PARTIAL_SUFFIX}"
+    recovered = 0
+    with open(path, 'rb') as source, zipfile.ZipFile(temp_path, 'w') as target:
+        while True:
+            header = source.read(LOCAL_HEADER.size)
+            if len(header) < LOCAL_HEADER.size:
+                break
+            signature, _, flags, method, mtime, mdate, crc, compressed_size, _, name_length, extra_length = LOCAL_HEADER.unpack(header)
+            if signature != LOCAL_HEADER_SIGNATURE or flags & 0x08 or method not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+                break
+            name = source.read(name_length).decode('utf-8' if flags & 0x800 else 'cp437')
+            source.read(extra_length)
+            data = source.read(compressed_size)
+            if len(data) < compressed_size:
+                break
+            try:
+                content = data if method == zipfile.ZIP_STORED else zlib.decompress(data, -15)
+            except zlib.error:
+                break
+            if zlib.crc32(content) != crc:
+                break
+            info = zipfile.ZipInfo(name, ((mdate >> 9) + 1980, (mdate >> 5) & 0xF, mdate & 0x1F, mtime >> 11, (mtime >> 5) & 0x3F, (mtime & 0x1F) * 2))
+            info.compress_type = method
+            target.writestr(info, content)
+            recovered += 1
+    os.replace(temp_path, path)
+    return recovered
+
+class SeriesArchive:
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with zipfile.ZipFile(path) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir():
+                        self.entries[info.filename] = info.file_size
+
+    def contains(self, name, size):
+        return self.entries.get(name) == size
+
+    def names_under(self, prefix):
+        return [name for name in self.entries if name.startswith(prefix)]
+
+    def update(self, files, removed=()):
+        removed = set(removed) | (set(files) & set(self.entries))
+        if not removed:
+            with zipfile.ZipFile(self.path, 'a' if os.path.exists(self.path) else 'w') as archive:
+                for name, path in files.items():
+                    archive.write(path, name, compress_type=archive_compression(name))
+        else:
+            temp_path = f"{self.path}{PARTIAL_SUFFIX}"
+            with zipfile.ZipFile(self.path) as source, zipfile.ZipFile(temp_path, 'w') as target:
+                for info in source.infolist():
+                    if info.filename in removed:
+                        continue
+                    with source.open(info) as src, target.open(info, 'w') as dst:
+                        shutil.copyfileobj(src, dst, IMAGE_CHUNK_SIZE)
+                for name, path in files.items():
+                    target.write(path, name, compress_type=archive_compression(name))
+            os.replace(temp_path, self.path)
+        for name in removed:
+            self.entries.pop(name, None)
+        for name, path in files.items():
+            self.entries[name] = os.path.getsize(path)
+
+    def write_cbz(self, prefix, cbz_path):
+        with zipfile.ZipFile(self.path) as source, zipfile.ZipFile(f"{cbz_path}{PARTIAL_SUFFIX}", 'w') as target:
+            for name in sorted(self.names_under(prefix)):
+                info = source.getinfo(name)
+                with source.open(info) as src, target.open(zipfile.ZipInfo(name[len(prefix):], info.date_time), 'w') as dst:
+                    shutil.copyfileobj(src, dst, IMAGE_CHUNK_SIZE)
+        os.replace(f"{cbz_path}{PARTIAL_SUFFIX}", cbz_path)